@@ -1,6 +1,6 @@
 from backend.db import db
 from backend.app.dtos import EventDTO
-from backend.services.video_service import VideoService
+from backend.services.video_service import get_shared_video_service
 
 
 class Event(db.Model):
@@ -27,8 +27,7 @@ class Event(db.Model):
         processed_video_url = self.video_url
         if self.video_url and self.video_url.startswith('gs://'):
             try:
-                video_service = VideoService()
-                processed_video_url = video_service.get_signed_video_url(self.video_url)
+                processed_video_url = get_shared_video_service().get_signed_video_url(self.video_url)
             except Exception as e:
                 # Log error but don't break the API - return original URL
                 print(f"Warning: Failed to generate signed URL for {self.video_url}: {e}")
@@ -13,7 +13,7 @@ from backend.services.events_service import EventsService
 from backend.app.request_bodies.event_request_body import EventRequestBody
 from backend.app.request_bodies.analysis_request_body import AnalysisRequestBody
 from backend.db import db
-from backend.services.event_description_service import EventDescriptionService
+from backend.services.event_description_service import get_shared_event_description_service
 from utils.logger_utils import create_logger
 
 # Create task-specific logger
@@ -69,8 +69,7 @@ def _store_analysis_results(task_id: str, analysis_result, video_url: str, shop_
     logger.info(f"[CELERY-TASK:{task_id}] Creating event record...")
     
     # Generate AI-powered event description from decision reasoning
-    event_description_service = EventDescriptionService()
-    detailed_description = event_description_service.generate_event_description(
+    detailed_description = get_shared_event_description_service().generate_event_description(
         analysis_result.decision_reasoning or 'No reasoning provided'
     )
     
@@ -1,7 +1,6 @@
-import os
 from utils.logger_utils import create_logger
 from data_science.src.model.pipeline.shoplifting_analyzer import create_agentic_analyzer
-from google_client.google_client import GoogleClient
+from google_client.google_client import GoogleClient, get_shared_google_client
 from backend.app.dtos.analysis_result_dto import AnalysisResultDTO
 
 
@@ -13,17 +12,52 @@ class AgenticService:
     using the agentic model approach.
     """
 
-    def __init__(self, shops_service):
-        """Initialize the agentic service."""
+    def __init__(self, shops_service, google_client: GoogleClient = None):
+        """
+        Initialize the agentic service.
+
+        Args:
+            shops_service: Instance of shops service
+            google_client (GoogleClient, optional): Pre-built Google client. If not provided, the shared
+                client configured from the environment is used, created on first analysis.
+        """
         self.shops_service = shops_service
         self.logger = create_logger("AgenticService", "agentic_service.log")
-        
-        # Initialize Google client for single video analysis
-        self.google_client = GoogleClient(
-            project=os.getenv("GOOGLE_PROJECT_ID"),
-            location=os.getenv("GOOGLE_PROJECT_LOCATION"),
-            service_account_json_path=os.getenv("SERVICE_ACCOUNT_FILE")
-        )
+
+        # The Google client (credentials, Vertex AI init, storage client) is created lazily,
+        # so constructing the service stays cheap when no analysis is run
+        self._google_client = google_client
+
+        # Analyzers are reused between analyses with the same detection threshold
+        self._analyzers = {}
+
+    @property
+    def google_client(self) -> GoogleClient:
+        """Google client for single video analysis, created on first access."""
+        if self._google_client is None:
+            self._google_client = get_shared_google_client()
+        return self._google_client
+
+    def _get_analyzer(self, detection_threshold: float):
+        """
+        Get the agentic analyzer for a detection threshold, creating it on first use.
+
+        Args:
+            detection_threshold (float): Threshold for shoplifting detection
+
+        Returns:
+            ShopliftingAnalyzer: Agentic analyzer configured with the threshold
+        """
+        analyzer = self._analyzers.get(detection_threshold)
+        if analyzer is None:
+            # Creating the Google client initializes Vertex AI, which the analysis models require
+            _ = self.google_client
+            analyzer = create_agentic_analyzer(
+                detection_threshold=detection_threshold,
+                logger=self.logger
+            )
+            self._analyzers[detection_threshold] = analyzer
+        return analyzer
 
     def analyze_single_video(self,
                              video_url: str,
@@ -51,11 +85,8 @@ class AgenticService:
         try:
             self.logger.info(f"Starting single video analysis for: {video_url}")
             
-            # Create agentic analyzer
-            shoplifting_analyzer = create_agentic_analyzer(
-                detection_threshold=detection_threshold,
-                logger=self.logger
-            )
+            # Get (or create) agentic analyzer
+            shoplifting_analyzer = self._get_analyzer(detection_threshold)
             
             # Analyze the video
             analysis_result = shoplifting_analyzer.analyze_video_from_bucket(
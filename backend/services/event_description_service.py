@@ -4,6 +4,7 @@ Event Description Service for generating AI-powered event descriptions.
 This service uses the EventDescriptionModel to generate concise, professional
 event descriptions from detailed decision reasoning.
 """
+from functools import lru_cache
 from typing import Optional
 from data_science.src.model.agentic.event_description_model import EventDescriptionModel
 from utils.logger_utils import create_logger
@@ -121,4 +122,18 @@ class EventDescriptionService:
         
         # Generic fallback based on common activities
         else:
-            return "Customer in store"
\ No newline at end of file
+            return "Customer in store"
+
+
+@lru_cache(maxsize=None)
+def get_shared_event_description_service() -> EventDescriptionService:
+    """
+    Get the process-wide EventDescriptionService, creating it on first use.
+
+    Worker processes handle many analysis tasks, so they share one service (and its lazily created
+    EventDescriptionModel) instead of building a new model for every stored event.
+
+    Returns:
+        EventDescriptionService: The shared event description service
+    """
+    return EventDescriptionService()
\ No newline at end of file
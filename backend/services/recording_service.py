@@ -7,10 +7,10 @@ import time
 from pathlib import Path
 from typing import Dict, Any
 from google.cloud import storage
-from google.oauth2.service_account import Credentials
 
 from backend.app.request_bodies.recording_request_body import StartRecordingRequestBody, StopRecordingRequestBody
 from backend.video.main import EXIT_CAMERA_NOT_FOUND, EXIT_GENERAL_ERROR, get_exit_code_description
+from google_client.google_client import get_shared_google_client
 from utils.logger_utils import create_logger
 
 
@@ -34,11 +34,9 @@ class RecordingService:
 
         # Initialize Google Cloud Storage client for querying uploaded videos
         try:
-            service_account_file = os.getenv("SERVICE_ACCOUNT_FILE")
-            if service_account_file:
-                credentials = Credentials.from_service_account_file(service_account_file)
-                project_id = os.getenv("GOOGLE_PROJECT_ID")
-                self.storage_client = storage.Client(project=project_id, credentials=credentials)
+            if os.getenv("SERVICE_ACCOUNT_FILE"):
+                # Reuse the storage client (and its connection pool) of the shared Google client
+                self.storage_client = get_shared_google_client().storage_client
             else:
                 # Fall back to default credentials
                 self.storage_client = storage.Client()
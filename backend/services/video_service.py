@@ -1,21 +1,38 @@
-import os
-from google_client.google_client import GoogleClient
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from google_client.google_client import GoogleClient, get_shared_google_client
 
 
 class VideoService:
     """Service for handling video-related operations including signed URL generation."""
-    
-    def __init__(self):
-        """Initialize the VideoService with Google Cloud client."""
-        self.google_client = GoogleClient(
-            project=os.getenv("GOOGLE_PROJECT_ID"),
-            location=os.getenv("GOOGLE_PROJECT_LOCATION"),
-            service_account_json_path=os.getenv("SERVICE_ACCOUNT_FILE")
-        )
+
+    # Maximum number of signed URLs kept for reuse
+    SIGNED_URL_CACHE_SIZE = 1024
+
+    def __init__(self, google_client: GoogleClient = None):
+        """
+        Initialize the VideoService with Google Cloud client.
+
+        Args:
+            google_client (GoogleClient, optional): Google client to use. Defaults to the shared client
+                configured from the environment.
+        """
+        self.google_client = google_client or get_shared_google_client()
+
+        # Signed URLs by (video_url, expiration_hours), with the monotonic time until which they are reused
+        self._signed_urls: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self._signed_urls_lock = threading.Lock()
     
     def get_signed_video_url(self, video_url: str, expiration_hours: int = 1) -> str:
         """
         Generate a signed URL for a GCS video URL.
+
+        Signed URLs are reused for the first half of their validity, so listing the same events
+        repeatedly does not sign every video URL again, while returned URLs always stay valid for
+        at least half of expiration_hours.
         
         Args:
             video_url (str): The original GCS URL (gs://bucket/path/to/video.mp4)
@@ -28,6 +45,13 @@ class VideoService:
             ValueError: If the video_url is not a valid GCS URL
             Exception: If there's an error generating the signed URL
         """
+        cache_key = (video_url, expiration_hours)
+        now = time.monotonic()
+        with self._signed_urls_lock:
+            cached = self._signed_urls.get(cache_key)
+        if cached is not None and now < cached[1]:
+            return cached[0]
+
         try:
             # Extract bucket and blob from the GCS URL
             bucket_name, blob_name = self.google_client.extract_bucket_and_blob_from_gs_url(video_url)
@@ -39,9 +63,28 @@ class VideoService:
                 expiration_hours=expiration_hours
             )
             
-            return signed_url
-            
         except ValueError as e:
             raise ValueError(f"Invalid video URL format: {e}")
         except Exception as e:
             raise Exception(f"Failed to generate signed URL: {e}")
+
+        with self._signed_urls_lock:
+            if len(self._signed_urls) >= self.SIGNED_URL_CACHE_SIZE:
+                # Drop URLs that are no longer reused, or start over if all of them still are
+                self._signed_urls = {key: value for key, value in self._signed_urls.items() if now < value[1]}
+                if len(self._signed_urls) >= self.SIGNED_URL_CACHE_SIZE:
+                    self._signed_urls.clear()
+            self._signed_urls[cache_key] = (signed_url, now + expiration_hours * 3600 / 2)
+
+        return signed_url
+
+
+@lru_cache(maxsize=None)
+def get_shared_video_service() -> VideoService:
+    """
+    Get the process-wide VideoService, creating it on first use.
+
+    Returns:
+        VideoService: Video service using the shared Google client
+    """
+    return VideoService()
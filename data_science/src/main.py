@@ -4,7 +4,7 @@ from google_client.google_client import GoogleClient
 from data_science.src.model.pipeline.shoplifting_analyzer import create_unified_analyzer, create_agentic_analyzer
 
 from data_science.src.utils import UNIFIED_MODEL, AGENTIC_MODEL
-from utils import load_env_variables, create_logger
+from utils import load_env_variables, create_logger, model_request_limiter
 
 load_env_variables()
 from data_science.src.model.pipeline.pipeline_manager import PipelineManager
@@ -53,9 +53,31 @@ def main():
                         help='Export results to CSV')
     parser.add_argument('--labels-csv-path', type=str, default=None,
                         help='Path to CSV file containing ground truth labels for accuracy comparison')
+    parser.add_argument('--max-concurrent-videos', type=int, default=4,
+                        help='Number of videos analyzed in parallel')
+    parser.add_argument('--results-cache-dir', type=str, default=os.path.join('analysis_results', 'cache'),
+                        help='Directory for cached per-video results, used to skip already analyzed videos')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-analyze all videos, ignoring cached results')
+    parser.add_argument('--candidates-per-request', type=int, default=1,
+                        help='Number of iterations sampled as candidates of one model request (the video is sent '
+                             'once per request). Applies to the unified model and the agentic CV model')
+    parser.add_argument('--max-requests-per-minute', type=float, default=None,
+                        help='Limit model requests across all concurrent analyses to this rate '
+                             '(defaults to MODEL_MAX_REQUESTS_PER_MINUTE, unlimited if unset)')
+    parser.add_argument('--early-stop-iterations', type=int, default=None,
+                        help='Agentic strategy: stop analyzing a video once this many consecutive iterations agree '
+                             'with confidence at or above the threshold')
+    parser.add_argument('--batch', action='store_true',
+                        help='Submit the unified analysis as a Vertex AI batch prediction job (slower, cheaper)')
+    parser.add_argument('--batch-output-uri', type=str, default=None,
+                        help='GCS prefix for batch prediction input and output files '
+                             '(defaults to gs://<bucket>/batch_predictions)')
 
 
     args = parser.parse_args()
+    if args.batch and args.strategy != UNIFIED_MODEL:
+        parser.error("--batch is only supported with --strategy unified")
 
     # Create logger for debugging
     logger = create_logger('AdvancedShopliftingAnalysis', 'advanced_main_analysis.log')
@@ -65,6 +87,15 @@ def main():
     logger.info(f"Iterations: {args.iterations}")
     logger.info(f"Threshold: {args.threshold}")
     logger.info(f"Diagnostic mode: {args.diagnostic}")
+    logger.info(f"Max concurrent videos: {args.max_concurrent_videos}")
+    logger.info(f"Results cache: {args.results_cache_dir} (force re-analysis: {args.force})")
+
+    # All model requests of this run share one requests-per-minute budget
+    max_requests_per_minute = args.max_requests_per_minute or float(os.getenv("MODEL_MAX_REQUESTS_PER_MINUTE", 0))
+    model_request_limiter.set_rate(max_requests_per_minute)
+    logger.info(f"Max model requests per minute: {max_requests_per_minute or 'unlimited'}")
+    if args.batch:
+        logger.info(f"Batch prediction: enabled (output: {args.batch_output_uri or 'gs://<bucket>/batch_predictions'})")
     logger.info(
         f"Ground truth labels: {args.labels_csv_path if args.labels_csv_path else 'None (no accuracy comparison)'}")
 
@@ -86,15 +117,24 @@ def main():
         # Create unified analyzer
         shoplifting_analyzer = create_unified_analyzer(
             detection_threshold=args.threshold,
-            logger=logger
+            logger=logger,
+            candidates_per_request=args.candidates_per_request
         )
 
         # Create pipeline manager
-        pipeline_manager = PipelineManager(google_client, shoplifting_analyzer, logger=logger)
-
-        results = pipeline_manager.run_unified_analysis(
-            bucket_name, args.max_videos, args.iterations, args.diagnostic, args.export, args.labels_csv_path
-        )
+        pipeline_manager = PipelineManager(google_client, shoplifting_analyzer, logger=logger,
+                                           results_cache_dir=args.results_cache_dir, force_reanalysis=args.force)
+
+        if args.batch:
+            results = pipeline_manager.run_unified_batch_analysis(
+                bucket_name, args.max_videos, args.iterations, args.export, args.labels_csv_path,
+                batch_output_uri=args.batch_output_uri
+            )
+        else:
+            results = pipeline_manager.run_unified_analysis(
+                bucket_name, args.max_videos, args.iterations, args.diagnostic, args.export, args.labels_csv_path,
+                max_concurrent_videos=args.max_concurrent_videos
+            )
 
     elif args.strategy == AGENTIC_MODEL:
         logger.info(f"[{AGENTIC_MODEL.upper()}] Using enhanced agentic model approach")
@@ -102,14 +142,18 @@ def main():
         # Create agentic analyzer
         shoplifting_analyzer = create_agentic_analyzer(
             detection_threshold=args.threshold,
-            logger=logger
+            logger=logger,
+            candidates_per_request=args.candidates_per_request,
+            early_stop_iterations=args.early_stop_iterations
         )
 
         # Create pipeline manager
-        pipeline_manager = PipelineManager(google_client, shoplifting_analyzer, logger=logger)
+        pipeline_manager = PipelineManager(google_client, shoplifting_analyzer, logger=logger,
+                                           results_cache_dir=args.results_cache_dir, force_reanalysis=args.force)
 
         results = pipeline_manager.run_agentic_analysis(
-            bucket_name, args.max_videos, args.iterations, args.diagnostic, args.export, args.labels_csv_path
+            bucket_name, args.max_videos, args.iterations, args.diagnostic, args.export, args.labels_csv_path,
+            max_concurrent_videos=args.max_concurrent_videos
         )
 
     logger.info("[SUCCESS] Advanced pipeline analysis completed successfully!")
@@ -16,10 +16,14 @@ import json
 from data_science.src.model.agentic.prompt_and_scheme.analysis_prompt import (default_system_instruction,
                                                                               enhanced_prompt, enhanced_response_schema)
 from data_science.src.model.agentic.prompt_and_scheme.computer_vision_prompt import cv_observations_prompt
-from utils import load_env_variables
+from utils import load_env_variables, loads_json, call_with_retry
 
 load_env_variables()
 
+# The analysis instructions never change between calls - only the formatted observations do -
+# so the static part of the prompt is assembled once at import time instead of per iteration.
+STATIC_ANALYSIS_PROMPT = enhanced_prompt + "\n\n" + cv_observations_prompt
+
 
 class AnalysisModel(GenerativeModel):
     """
@@ -55,6 +59,26 @@ class AnalysisModel(GenerativeModel):
         HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_LOW_AND_ABOVE,
     }
 
+    # Structured CV observation fields and their section titles in the analysis prompt (in prompt order)
+    OBSERVATION_SECTION_TITLES = {
+        "person_description": "PERSON DESCRIPTION & MOVEMENTS",
+        "item_interactions": "ITEM INTERACTION ANALYSIS",
+        "hand_movements": "HAND MOVEMENT & BODY BEHAVIOR",
+        "behavioral_sequence": "BEHAVIORAL SEQUENCE DOCUMENTATION",
+        "environmental_context": "ENVIRONMENTAL CONTEXT",
+        "suspicious_indicators": "SUSPICIOUS BEHAVIOR INDICATORS",
+        "normal_indicators": "NORMAL SHOPPING INDICATORS"
+    }
+
+    # Section headers of the formatted observations, built once instead of on every iteration
+    OBSERVATION_SECTION_HEADERS = {key: f"**{title}:**" for key, title in OBSERVATION_SECTION_TITLES.items()}
+
+    # Evidence tiers counted as strong theft evidence
+    STRONG_EVIDENCE_TIERS = frozenset({"TIER_1_HIGH", "TIER_2_MODERATE"})
+
+    # Observation fields holding lists of indicators rather than free text
+    LIST_OBSERVATION_FIELDS = frozenset({"suspicious_indicators", "normal_indicators"})
+
     def __init__(self,
                  # default to the DEFAULT_ANALYSIS_MODEL_ID environment variable if not provided. if also this is not provided, default to DEFAULT_MODEL_ID.
                  model_name: str = os.getenv("DEFAULT_ANALYSIS_MODEL_ID", os.getenv("DEFAULT_MODEL_ID")),
@@ -94,16 +118,17 @@ class AnalysisModel(GenerativeModel):
         # Format structured observations for analysis
         formatted_observations = self._format_structured_observations(structured_observations)
 
-        # Use enhanced analysis prompt_and_scheme with formatted observations
-        updated_enhanced_prompt = (enhanced_prompt + "\n\n" + cv_observations_prompt + "\n\n" + formatted_observations)
-        contents = [video_file, updated_enhanced_prompt]
+        # Keep the request prefix (system instruction, video, static prompt) byte-identical across iterations
+        # and send the varying observations as the last part, so Vertex AI implicit context caching can reuse
+        # the already-processed prefix tokens instead of recomputing them for every iteration.
+        contents = [video_file, STATIC_ANALYSIS_PROMPT, formatted_observations]
 
         # Generate analysis
-        response = self.generate_content(
+        response = call_with_retry(lambda: self.generate_content(
             contents,
             generation_config=self._generation_config,
             safety_settings=self._safety_settings,
-        )
+        ))
 
         # Extract detailed results from model
         detected, confidence, detailed_analysis = self._extract_enhanced_response(response)
@@ -122,23 +147,15 @@ class AnalysisModel(GenerativeModel):
         """
         formatted = []
 
-        section_mapping = {
-            "person_description": "PERSON DESCRIPTION & MOVEMENTS",
-            "item_interactions": "ITEM INTERACTION ANALYSIS",
-            "hand_movements": "HAND MOVEMENT & BODY BEHAVIOR",
-            "behavioral_sequence": "BEHAVIORAL SEQUENCE DOCUMENTATION",
-            "environmental_context": "ENVIRONMENTAL CONTEXT",
-            "suspicious_indicators": "SUSPICIOUS BEHAVIOR INDICATORS",
-            "normal_indicators": "NORMAL SHOPPING INDICATORS"
-        }
-
-        for key, section_title in section_mapping.items():
-            if key in cv_structured_obs and cv_structured_obs[key] != "Not found in observations":
-                formatted.append(f"**{section_title}:**")
+        for key, section_header in self.OBSERVATION_SECTION_HEADERS.items():
+            if key not in cv_structured_obs:
+                continue
+            value = cv_structured_obs[key]
+            if value != "Not found in observations":
+                formatted.append(section_header)
 
                 # Handle array fields (suspicious_indicators, normal_indicators) properly
-                if key in ["suspicious_indicators", "normal_indicators"]:
-                    value = cv_structured_obs[key]
+                if key in self.LIST_OBSERVATION_FIELDS:
                     if isinstance(value, list):
                         if value:  # Non-empty list
                             formatted.append("\n".join(f"- {item}" for item in value))
@@ -148,7 +165,7 @@ class AnalysisModel(GenerativeModel):
                         formatted.append(str(value))
                 else:
                     # Handle string fields normally
-                    formatted.append(str(cv_structured_obs[key]))
+                    formatted.append(str(value))
 
                 formatted.append("")
 
@@ -165,7 +182,7 @@ class AnalysisModel(GenerativeModel):
             Tuple[bool, float, Dict]: (detected, confidence, detailed_analysis)
         """
         try:
-            response_json = json.loads(model_response.text)
+            response_json = loads_json(model_response.text)
 
             detected = response_json["Shoplifting Detected"]
             confidence = response_json["Confidence Level"]
@@ -219,7 +236,7 @@ class AnalysisModel(GenerativeModel):
         # Check for strong theft evidence that should be protected from override
         strong_theft_evidence = self._is_there_strong_theft_evidence(shoplifting_detection_threshold, detailed_analyses)
         reasoning_of_iteration_with_confidence_closest_to_the_average_confidence = self._find_reasoning_near_avg_confidence(
-            confidences, detailed_analyses)
+            confidences, detailed_analyses, avg_confidence)
 
         # Determine the final decision based on detection rate, confidence, and evidence strength.
         final_confidence, final_detection, reasoning_summary = self._get_detection_confidence_summary(
@@ -248,22 +265,18 @@ class AnalysisModel(GenerativeModel):
         if not detailed_analyses:
             return False
 
-        total = len(detailed_analyses)
-        matches = 0
-
-        for analysis in detailed_analyses:
-            concealment_actions = analysis.get("concealment_actions", [])
-            evidence_tier = analysis.get("evidence_tier", "")
-            # Strong evidence indicators
-            if concealment_actions or evidence_tier in ["TIER_1_HIGH", "TIER_2_MODERATE"]:
-                matches += 1
+        # Strong evidence indicators: concealment actions or a strong/moderate evidence tier
+        matches = sum(1 for analysis in detailed_analyses
+                      if analysis.get("concealment_actions")
+                      or analysis.get("evidence_tier") in self.STRONG_EVIDENCE_TIERS)
 
-        ratio = matches / total
+        ratio = matches / len(detailed_analyses)
         return ratio >= shoplifting_detection_threshold
 
     def _find_reasoning_near_avg_confidence(self,
                                             confidences: List[float],
-                                            detailed_analyses: List[Dict] = None) -> str:
+                                            detailed_analyses: List[Dict] = None,
+                                            avg_confidence: float = None) -> str:
         """
         Helper function to find the iteration with confidence closest to the average confidence
         and return its decision reasoning.
@@ -271,6 +284,7 @@ class AnalysisModel(GenerativeModel):
         Args:
             confidences (List[float]): List of confidence scores from iterations
             detailed_analyses (List[Dict], optional): Detailed analysis results
+            avg_confidence (float, optional): Precomputed average of confidences, computed here if not given
 
         Returns:
             str: Decision reasoning from the closest iteration, or empty string if not found
@@ -283,7 +297,7 @@ class AnalysisModel(GenerativeModel):
         if n == 0:
             return ""
 
-        avg = sum(confidences) / len(confidences)
+        avg = avg_confidence if avg_confidence is not None else sum(confidences) / len(confidences)
 
         closest_idx = min(range(n), key=lambda i: abs(confidences[i] - avg))
         reasoning = detailed_analyses[closest_idx].get("decision_reasoning", "")
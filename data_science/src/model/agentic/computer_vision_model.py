@@ -6,16 +6,31 @@ from vertexai.generative_models import (
     Part
 )
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from vertexai.generative_models._generative_models import PartsType, GenerationConfigType, SafetySettingsType
 import os
+import json
 
 from data_science.src.model.agentic.prompt_and_scheme.computer_vision_prompt import enhanced_response_schema, \
     default_system_instruction, enhanced_observation_prompt
-from utils import load_env_variables
+from data_science.src.model.generation_config_utils import with_candidate_count
+from utils import load_env_variables, loads_json, call_with_retry
 
 load_env_variables()
 
+# Default structured observations returned when the model response can't be parsed as JSON
+UNPARSED_STRUCTURED_OBSERVATIONS = {
+    "person_description": "Unable to parse structured response",
+    "item_interactions": "Unable to parse structured response",
+    "hand_movements": "Unable to parse structured response",
+    "behavioral_sequence": "Unable to parse structured response",
+    "environmental_context": "Unable to parse structured response",
+    "suspicious_indicators": [],
+    "normal_indicators": [],
+    "behavioral_tone": "unclear",
+    "observation_confidence": 0.1
+}
+
 
 class ComputerVisionModel(GenerativeModel):
     """
@@ -57,7 +72,13 @@ class ComputerVisionModel(GenerativeModel):
                  generation_config: Optional[GenerationConfigType] = None,
                  safety_settings: Optional[SafetySettingsType] = None,
                  system_instruction: Optional[PartsType] = None,
-                 labels: Optional[Dict[str, str]] = None):
+                 labels: Optional[Dict[str, str]] = None,
+                 candidates_per_request: int = 1):
+        """
+        Args:
+            candidates_per_request (int, optional): Number of observation samples generated per request. Defaults to 1.
+        """
+        self.candidates_per_request = max(1, candidates_per_request)
 
         if system_instruction is None:
             system_instruction = default_system_instruction
@@ -92,11 +113,11 @@ class ComputerVisionModel(GenerativeModel):
         contents = [video_file, prompt]
 
         # Generate comprehensive observations
-        response = self.generate_content(
+        response = call_with_retry(lambda: self.generate_content(
             contents,
             generation_config=self._generation_config,
             safety_settings=self._safety_settings,
-        )
+        ))
 
         return response.text
 
@@ -110,12 +131,50 @@ class ComputerVisionModel(GenerativeModel):
         Returns:
             Dict[str, str]: Structured observations organized by category
         """
-        observations = self.analyze_video(video_file)
+        return self._parse_structured_observations(self.analyze_video(video_file))
+
+    def analyze_video_structured_samples(self, video_file: Part, candidate_count: int) -> List[Dict[str, str]]:
+        """
+        Provide several independent structured video analyses, generated as candidates of a single request.
+
+        Args:
+            video_file (Part): Video file part object
+            candidate_count (int): Number of analyses (response candidates) to generate
+
+        Returns:
+            List[Dict[str, str]]: Structured observations of every candidate
+
+        Raises:
+            ValueError: If the response holds fewer candidates than requested (e.g. blocked by the safety filters)
+        """
+        if candidate_count == 1:
+            return [self.analyze_video_structured(video_file)]
+
+        response = call_with_retry(lambda: self.generate_content(
+            [video_file, enhanced_observation_prompt],
+            generation_config=with_candidate_count(self._generation_config, candidate_count),
+            safety_settings=self._safety_settings,
+        ))
+
+        if len(response.candidates) < candidate_count:
+            raise ValueError(f"Expected {candidate_count} response candidates, got {len(response.candidates)}")
+
+        return [self._parse_structured_observations(candidate.text) for candidate in response.candidates]
+
+    @staticmethod
+    def _parse_structured_observations(observations: str) -> Dict[str, str]:
+        """
+        Parse the JSON observations returned by the model.
+
+        Args:
+            observations (str): Model response text
 
+        Returns:
+            Dict[str, str]: Structured observations organized by category
+        """
         try:
             # Parse JSON response directly
-            import json
-            structured_data = json.loads(observations)
+            structured_data = loads_json(observations)
             
             # Add full observations for compatibility
             structured_data["full_observations"] = observations
@@ -123,16 +182,11 @@ class ComputerVisionModel(GenerativeModel):
             return structured_data
             
         except json.JSONDecodeError:
-            # Return default structured response if JSON parsing fails
+            # Return default structured response if JSON parsing fails (fresh lists, so callers can't
+            # mutate the shared defaults)
             return {
                 "full_observations": observations,
-                "person_description": "Unable to parse structured response",
-                "item_interactions": "Unable to parse structured response", 
-                "hand_movements": "Unable to parse structured response",
-                "behavioral_sequence": "Unable to parse structured response",
-                "environmental_context": "Unable to parse structured response",
+                **UNPARSED_STRUCTURED_OBSERVATIONS,
                 "suspicious_indicators": [],
-                "normal_indicators": [],
-                "behavioral_tone": "unclear",
-                "observation_confidence": 0.1
+                "normal_indicators": []
             }
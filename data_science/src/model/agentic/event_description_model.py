@@ -5,6 +5,7 @@ from vertexai.generative_models import (
     HarmCategory
 )
 
+from functools import lru_cache
 from typing import Dict, Optional
 from vertexai.generative_models._generative_models import PartsType, GenerationConfigType, SafetySettingsType
 import os
@@ -13,10 +14,30 @@ from data_science.src.model.agentic.prompt_and_scheme.event_description_prompt i
     default_system_instruction,
     event_description_response_schema
 )
-from utils import load_env_variables
+from utils import load_env_variables, loads_json, call_with_retry
 
 load_env_variables()
 
+# Prompt template for event descriptions - only the analysis text changes between calls. It comes last,
+# so every request shares the same instruction prefix (which the model's prefix caching can reuse).
+EVENT_DESCRIPTION_PROMPT_TEMPLATE = """
+Generate a concise 1-6 word description of what the person was actually doing in the video described by the
+analysis below.
+
+Focus on OBSERVABLE ACTIONS, not security classifications.
+
+Examples:
+- "Person checking phone while shopping"
+- "Customer examining product labels"
+- "Individual browsing clothing rack"
+- "Person putting item in pocket"
+- "Shopper comparing two products"
+
+Respond with JSON containing only the event_description field.
+
+ANALYSIS: {analysis}
+"""
+
 
 class EventDescriptionModel(GenerativeModel):
     """
@@ -44,6 +65,9 @@ class EventDescriptionModel(GenerativeModel):
         response_schema=event_description_response_schema
     )
 
+    # Number of recent (truncated) decision reasonings whose descriptions are kept for reuse
+    DESCRIPTION_CACHE_SIZE = 256
+
     # Set safety settings - allow security-related content
     default_safety_settings = {
         HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_LOW_AND_ABOVE,
@@ -75,6 +99,11 @@ class EventDescriptionModel(GenerativeModel):
                          system_instruction=system_instruction,
                          labels=labels)
 
+        # Identical reasoning (e.g. re-analyzed or replayed recordings) reuses the description instead of
+        # calling the model again. Failures raise, so they are never cached.
+        self._generate_description_cached = lru_cache(maxsize=self.DESCRIPTION_CACHE_SIZE)(
+            self._generate_description_for_analysis)
+
     def generate_description(self, decision_reasoning: str) -> str:
         """
         Generate a concise event description from decision reasoning.
@@ -91,34 +120,34 @@ class EventDescriptionModel(GenerativeModel):
         if not decision_reasoning or not decision_reasoning.strip():
             return "Analysis completed"
         
-        # Prepare a concise prompt with the decision reasoning
-        prompt = f"""
-Generate a concise 1-6 word description of what the person was actually doing in this video:
+        # Only the first 500 characters reach the prompt, so they are the cache key
+        return self._generate_description_cached(decision_reasoning[:500])
 
-ANALYSIS: {decision_reasoning[:500]}
+    def _generate_description_for_analysis(self, analysis: str) -> str:
+        """
+        Generate an event description with the model.
 
-Focus on OBSERVABLE ACTIONS, not security classifications.
+        Args:
+            analysis (str): The (truncated) decision reasoning to describe
 
-Examples:
-- "Person checking phone while shopping"
-- "Customer examining product labels"
-- "Individual browsing clothing rack"
-- "Person putting item in pocket"
-- "Shopper comparing two products"
+        Returns:
+            str: Concise 1-6 word event description
 
-Respond with JSON containing only the event_description field.
-"""
+        Raises:
+            Exception: If generation fails
+        """
+        # Prepare a concise prompt with the decision reasoning
+        prompt = EVENT_DESCRIPTION_PROMPT_TEMPLATE.format(analysis=analysis)
         
         try:
             # Generate the description
-            response = self.generate_content(prompt)
+            response = call_with_retry(lambda: self.generate_content(prompt))
             
             if not response or not response.text:
                 raise Exception("Empty response from model")
             
             # Parse JSON response
-            import json
-            result = json.loads(response.text)
+            result = loads_json(response.text)
             description = result.get("event_description", "").strip()
             
             if not description:
@@ -0,0 +1,29 @@
+"""
+Generation config helpers shared by the Vertex AI models.
+"""
+from typing import Dict, Optional, Union
+
+from vertexai.generative_models import GenerationConfig
+
+
+def with_candidate_count(generation_config: Optional[Union[GenerationConfig, Dict]],
+                         candidate_count: int) -> GenerationConfig:
+    """
+    Copy a generation config with another candidate count.
+
+    Sampling several candidates in one request sends the video (and bills its input tokens) once
+    for all of them, instead of once per analysis iteration.
+
+    Args:
+        generation_config (GenerationConfig or Dict, optional): The model's generation config
+        candidate_count (int): Number of candidates to generate
+
+    Returns:
+        GenerationConfig: Copy of the config with the given candidate count
+    """
+    if isinstance(generation_config, GenerationConfig):
+        config_dict = generation_config.to_dict()
+    else:
+        config_dict = dict(generation_config or {})
+    config_dict["candidate_count"] = candidate_count
+    return GenerationConfig.from_dict(config_dict)
@@ -1,13 +1,29 @@
-from google_client.google_client import GoogleClient
+from google_client.google_client import GoogleClient, GCS_REQUEST_TIMEOUT, GCS_UPLOAD_RETRY
 from data_science.src.model.pipeline.shoplifting_analyzer import ShopliftingAnalyzer
+from data_science.src.model.unified.prompt.unified_prompt import unified_prompt
+from data_science.src.model.agentic.prompt_and_scheme.analysis_prompt import enhanced_prompt
+from data_science.src.model.agentic.prompt_and_scheme.computer_vision_prompt import enhanced_observation_prompt, \
+    cv_observations_prompt
 import pandas as pd
 import datetime
+import hashlib
+import json
 import os
 import logging
+import time
 import numpy as np
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 
 from data_science.src.utils import UNIFIED_MODEL, AGENTIC_MODEL
+from utils import loads_json, dumps_json_bytes, write_json_atomic
+
+# Digest of the prompts sent with the analysis requests. Part of the results cache key, so editing a
+# prompt invalidates the results analyzed with the old one
+ANALYSIS_PROMPTS_DIGEST = hashlib.blake2b(
+    json.dumps([unified_prompt, enhanced_observation_prompt, cv_observations_prompt, enhanced_prompt]).encode("utf-8"),
+    digest_size=16
+).hexdigest()
 
 
 class PipelineManager:
@@ -20,8 +36,17 @@ class PipelineManager:
     Consolidates all pipeline management functionality in one place.
     """
 
+    VIDEO_EXTENSIONS = ('.mp4', '.avi')
+
+    # Concurrent prefix listings and batch output downloads. Kept below the storage client's default
+    # HTTP pool size (10) so these threads reuse connections instead of opening and discarding new ones.
+    LISTING_MAX_WORKERS = 8
+
+    # Blob metadata requested by bucket listings (the MD5 hash identifies the video content for caching)
+    LISTING_BLOB_FIELDS = "name,generation,md5Hash"
+
     def __init__(self, google_client: GoogleClient, shoplifting_analyzer: ShopliftingAnalyzer,
-                 logger: logging.Logger = None):
+                 logger: logging.Logger = None, results_cache_dir: str = None, force_reanalysis: bool = False):
         """
         Initialize unified pipeline manager.
         
@@ -29,33 +54,67 @@ class PipelineManager:
             google_client (GoogleClient): Google Cloud client for video access
             shoplifting_analyzer (ShopliftingAnalyzer, optional): Legacy analyzer for compatibility
             logger (logging.Logger, optional): Logger instance
+            results_cache_dir (str, optional): Directory where per-video results are cached, so re-running
+                the pipeline (e.g. after a crash) skips videos that were already analyzed. Defaults to None
+                (no caching).
+            force_reanalysis (bool, optional): Ignore cached results and analyze every video again.
+                Defaults to False.
         """
         self.google_client = google_client
         self.shoplifting_analyzer = shoplifting_analyzer
         self.logger = logger
+        self.results_cache_dir = results_cache_dir
+        self.force_reanalysis = force_reanalysis
 
     def analyze_all_videos_in_bucket(self,
                                      bucket_name: str,
                                      export_results: bool = False,
-                                     labels_csv_path: str = None):
+                                     labels_csv_path: str = None,
+                                     iterations: int = 3,
+                                     max_concurrent_videos: int = 1):
         """
         Analyze all videos in a specified bucket and optionally export results to CSV.
+        When a results cache is configured, videos analyzed by a previous (e.g. interrupted) run are
+        skipped and their cached results are returned.
 
         Args:
             bucket_name (str): Name of the Google Cloud Storage bucket
             export_results (bool, optional): Whether to export results to CSV. Defaults to False.
             labels_csv_path (str, optional): Path to CSV file containing ground truth labels for this bucket
+            iterations (int, optional): Number of analysis iterations per video. Defaults to 3.
+            max_concurrent_videos (int, optional): Number of videos analyzed in parallel. Defaults to 1 (sequential).
         Returns:
             dict: Dictionary containing analysis results for each video
         """
 
-        # Get video URIs and names
-        uris, names = self.google_client.get_videos_uris_and_names_from_buckets(bucket_name)
+        # Get video URIs and names. With a results cache, the listing also has the content versions
+        # identifying the cached results of each video, so the bucket is only listed once.
+        if self.results_cache_dir:
+            video_versions = self._get_video_versions_from_bucket(bucket_name)
+            uris = [uri for uri in video_versions if uri.endswith(('.mp4', '.MP4'))]
+            bucket_prefix = f"gs://{bucket_name}/"
+            names = [uri[len(bucket_prefix):] for uri in uris]
+        else:
+            video_versions = {}
+            uris, names = self.google_client.get_videos_uris_and_names_from_buckets(bucket_name)
+        strategy_name = self.shoplifting_analyzer.strategy.upper()
+
+        def analyze(uri: str) -> Dict:
+            cache_path, fingerprint, cached_result = self._lookup_cached_result(
+                self.shoplifting_analyzer, uri, video_versions.get(uri), iterations, strategy_name
+            )
+            if cached_result is not None:
+                return cached_result
 
-        final_predictions = {}
-        for uri, name in zip(uris, names):
-            analysis = self.shoplifting_analyzer.analyze_video_from_bucket(uri)
-            final_predictions[name] = analysis
+            analysis = self.shoplifting_analyzer.analyze_video_from_bucket(uri, iterations=iterations)
+            if cache_path and self._is_successful_analysis(analysis):
+                self._store_cached_result(cache_path, fingerprint, analysis)
+            return analysis
+
+        # executor.map keeps the predictions in the same order as the videos
+        max_workers = max(1, min(max_concurrent_videos or 1, len(uris)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            final_predictions = dict(zip(names, executor.map(analyze, uris)))
 
         if export_results:
             self._export_results(final_predictions, labels_csv_path)
@@ -63,7 +122,7 @@ class PipelineManager:
         return final_predictions
 
     def run_unified_analysis(self, bucket_name: str, max_videos: int, iterations: int, diagnostic: bool, export: bool,
-                             labels_csv_path: str = None) -> List[Dict]:
+                             labels_csv_path: str = None, max_concurrent_videos: int = 1) -> List[Dict]:
         """
         Run unified analysis strategy.
         
@@ -74,6 +133,7 @@ class PipelineManager:
             diagnostic (bool): Enable diagnostic mode
             export (bool): Export results to CSV
             labels_csv_path (str, optional): Path to CSV file containing ground truth labels
+            max_concurrent_videos (int, optional): Number of videos analyzed in parallel. Defaults to 1.
             
         Returns:
             List[Dict]: Analysis results
@@ -87,15 +147,120 @@ class PipelineManager:
         # Run analysis
         results = self._analyze_videos_with_strategy(
             self.shoplifting_analyzer, bucket_name, max_videos, iterations,
-            diagnostic, export, UNIFIED_MODEL.upper(), labels_csv_path
+            diagnostic, export, UNIFIED_MODEL.upper(), labels_csv_path, max_concurrent_videos
         )
 
         self._log_strategy_summary(UNIFIED_MODEL.upper(), results)
 
         return results
 
+    def run_unified_batch_analysis(self, bucket_name: str, max_videos: int, iterations: int, export: bool,
+                                   labels_csv_path: str = None, batch_output_uri: str = None,
+                                   poll_interval_seconds: int = 60) -> List[Dict]:
+        """
+        Run unified analysis strategy through a Vertex AI batch prediction job.
+
+        All iterations of all videos are submitted as a single asynchronous job instead of one online
+        request each. Batch jobs are billed at a discount and are not subject to the online per-minute
+        quota, at the cost of latency (jobs usually take minutes to hours), which suits offline
+        evaluation runs over whole buckets.
+
+        Args:
+            bucket_name (str): GCS bucket containing videos
+            max_videos (int): Maximum number of videos to analyze
+            iterations (int): Number of analysis iterations
+            export (bool): Export results to CSV
+            labels_csv_path (str, optional): Path to CSV file containing ground truth labels
+            batch_output_uri (str, optional): GCS prefix for the job's input and output files.
+                Defaults to gs://<bucket_name>/batch_predictions.
+            poll_interval_seconds (int, optional): Seconds between job status checks. Defaults to 60.
+
+        Returns:
+            List[Dict]: Analysis results
+        """
+        self.logger.info("=== INITIALIZING UNIFIED STRATEGY (BATCH) ===")
+
+        # Validate analyzer strategy
+        if self.shoplifting_analyzer.strategy != UNIFIED_MODEL:
+            raise ValueError("Analyzer must be configured for unified strategy")
+
+        strategy_name = UNIFIED_MODEL.upper()
+        video_limit_text = f"first {max_videos}" if max_videos else "all"
+        self.logger.info(f"[BATCH] Starting unified batch analysis of {video_limit_text} videos in bucket: {bucket_name}")
+
+        video_versions = self._get_video_versions_from_bucket(bucket_name)
+        video_uris = list(video_versions)
+
+        if not video_uris:
+            self.logger.warning("[WARNING] No video files found in bucket")
+            return []
+
+        videos_to_process = video_uris[:max_videos] if max_videos is not None else video_uris
+        self.logger.info(f"[ANALYZING] {len(videos_to_process)} videos")
+
+        # Reuse cached results, only videos without one are submitted to the batch job
+        results_by_uri = {}
+        cache_entries = {}
+        for video_uri in videos_to_process:
+            cache_path, fingerprint, cached_result = self._lookup_cached_result(
+                self.shoplifting_analyzer, video_uri, video_versions.get(video_uri), iterations, strategy_name
+            )
+            if cached_result is not None:
+                results_by_uri[video_uri] = cached_result
+            elif cache_path:
+                cache_entries[video_uri] = (cache_path, fingerprint)
+
+        pending_uris = [video_uri for video_uri in videos_to_process if video_uri not in results_by_uri]
+        if pending_uris:
+            if batch_output_uri is None:
+                batch_output_uri = f"gs://{bucket_name}/batch_predictions"
+
+            try:
+                responses_by_uri = self._run_unified_batch_job(pending_uris, iterations, batch_output_uri,
+                                                               poll_interval_seconds)
+            except Exception as e:
+                self.logger.error(f"[ERROR] Batch prediction job failed: {e}")
+                responses_by_uri = {}
+                batch_error = str(e)
+            else:
+                batch_error = "No successful batch prediction responses for video"
+
+            for video_uri in pending_uris:
+                response_texts = responses_by_uri.get(video_uri)
+                if not response_texts:
+                    self.logger.error(f"[ERROR] Failed to analyze {video_uri}: {batch_error}")
+                    results_by_uri[video_uri] = {
+                        "video_identifier": video_uri,
+                        "error": batch_error,
+                        "final_detection": False,
+                        "final_confidence": 0.0,
+                        "analysis_approach": f"{strategy_name}_ENHANCED"
+                    }
+                    continue
+
+                result = self.shoplifting_analyzer.analyze_unified_batch_responses(video_uri, response_texts)
+                self.logger.info(f"  [RESULT] {video_uri}: detected={result.get('final_detection', False)}, "
+                                 f"confidence={result.get('final_confidence', 0.0):.3f}")
+                results_by_uri[video_uri] = result
+
+                # Only successful analyses are cached, so failed videos are retried on the next run
+                if video_uri in cache_entries and self._is_successful_analysis(result):
+                    self._store_cached_result(*cache_entries[video_uri], result)
+
+        all_results = [results_by_uri[video_uri] for video_uri in videos_to_process]
+        failed_analyses = sum(1 for result in all_results if 'error' in result)
+
+        self._log_full_analysis_summary(all_results, len(all_results) - failed_analyses, failed_analyses,
+                                        len(video_uris), strategy_name)
+
+        if export and all_results:
+            self._export_strategy_results(all_results, strategy_name, labels_csv_path)
+
+        self._log_strategy_summary(strategy_name, all_results)
+        return all_results
+
     def run_agentic_analysis(self, bucket_name: str, max_videos: int, iterations: int, diagnostic: bool, export: bool,
-                             labels_csv_path: str = None) -> List[Dict]:
+                             labels_csv_path: str = None, max_concurrent_videos: int = 1) -> List[Dict]:
         """
         Run agentic analysis strategy.
         
@@ -106,6 +271,7 @@ class PipelineManager:
             diagnostic (bool): Enable diagnostic mode
             export (bool): Export results to CSV
             labels_csv_path (str, optional): Path to CSV file containing ground truth labels
+            max_concurrent_videos (int, optional): Number of videos analyzed in parallel. Defaults to 1.
             
         Returns:
             List[Dict]: Analysis results
@@ -119,7 +285,7 @@ class PipelineManager:
         # Run analysis
         results = self._analyze_videos_with_strategy(
             self.shoplifting_analyzer, bucket_name, max_videos, iterations,
-            diagnostic, export, AGENTIC_MODEL.upper(), labels_csv_path
+            diagnostic, export, AGENTIC_MODEL.upper(), labels_csv_path, max_concurrent_videos
         )
 
         self._log_strategy_summary(AGENTIC_MODEL.upper(), results)
@@ -127,7 +293,8 @@ class PipelineManager:
 
     def _analyze_videos_with_strategy(self, analyzer, bucket_name: str, max_videos: int,
                                       iterations: int, diagnostic: bool, export: bool,
-                                      strategy_name: str, labels_csv_path: str = None) -> List[Dict]:
+                                      strategy_name: str, labels_csv_path: str = None,
+                                      max_concurrent_videos: int = 1) -> List[Dict]:
         """
         Core analysis engine that works with any analyzer strategy.
 
@@ -140,6 +307,7 @@ class PipelineManager:
             export (bool): Export results to CSV
             strategy_name (str): Name of the strategy for logging
             labels_csv_path (str, optional): Path to CSV file containing ground truth labels
+            max_concurrent_videos (int, optional): Number of videos analyzed in parallel. Defaults to 1 (sequential).
 
         Returns:
             List[Dict]: Analysis results
@@ -151,8 +319,9 @@ class PipelineManager:
         self.logger.info(
             f"[{mode_label}] Starting {strategy_name.lower()} analysis of {video_limit_text} videos in bucket: {bucket_name}")
 
-        # Get list of video files from bucket
-        video_uris = self._get_video_uris_from_bucket(bucket_name)
+        # Get list of video files (and their content versions) from bucket
+        video_versions = self._get_video_versions_from_bucket(bucket_name)
+        video_uris = list(video_versions)
 
         if not video_uris:
             self.logger.warning("[WARNING] No video files found in bucket")
@@ -166,46 +335,23 @@ class PipelineManager:
             videos_to_process = video_uris
             self.logger.info(f"[ANALYZING] All {len(videos_to_process)} videos")
 
-        # Process videos
-        all_results = []
-        successful_analyses = 0
-        failed_analyses = 0
-
-        for i, video_uri in enumerate(videos_to_process, 1):
-            progress_label = f"[VIDEO {i}/{len(videos_to_process)}]" if diagnostic else f"[PROCESSING] Video {i}/{len(videos_to_process)}"
-            self.logger.info(f"{progress_label} {video_uri}")
-
-            try:
-                # Call appropriate analysis method - both strategies now use iterations
-                result = analyzer.analyze_video_from_bucket(
-                    video_uri,
-                    iterations=iterations,
-                    pickle_analysis=diagnostic
-                )
+        # Process videos - executor.map keeps results in the same order as videos_to_process
+        total_to_process = len(videos_to_process)
+        max_workers = max(1, min(max_concurrent_videos or 1, total_to_process))
+        if max_workers > 1:
+            self.logger.info(f"[CONCURRENCY] Analyzing up to {max_workers} videos in parallel")
 
-                all_results.append(result)
-                successful_analyses += 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            all_results = list(executor.map(
+                lambda indexed_uri: self._analyze_single_video(
+                    analyzer, indexed_uri[1], indexed_uri[0], total_to_process, iterations, diagnostic, strategy_name,
+                    video_versions.get(indexed_uri[1])
+                ),
+                enumerate(videos_to_process, 1)
+            ))
 
-                # Enhanced logging
-                if diagnostic:
-                    self._log_diagnostic_details(result, video_uri, strategy_name)
-                else:
-                    final_detection = result.get('final_detection', False)
-                    final_confidence = result.get('final_confidence', 0.0)
-                    self.logger.info(f"  [RESULT] detected={final_detection}, confidence={final_confidence:.3f}")
-
-            except Exception as e:
-                self.logger.error(f"[ERROR] Failed to analyze {video_uri}: {e}")
-                failed_analyses += 1
-
-                error_result = {
-                    "video_identifier": video_uri,
-                    "error": str(e),
-                    "final_detection": False,
-                    "final_confidence": 0.0,
-                    "analysis_approach": f"{strategy_name}_ENHANCED"
-                }
-                all_results.append(error_result)
+        failed_analyses = sum(1 for result in all_results if 'error' in result)
+        successful_analyses = len(all_results) - failed_analyses
 
         # Generate summary
         if diagnostic:
@@ -220,34 +366,461 @@ class PipelineManager:
 
         return all_results
 
+    def _analyze_single_video(self, analyzer, video_uri: str, index: int, total: int, iterations: int,
+                              diagnostic: bool, strategy_name: str, video_version: str = None) -> Dict:
+        """
+        Analyze one video and log its outcome, converting failures into error results.
+        When a results cache is configured, a cached result for the same video content and
+        analysis settings is returned instead of analyzing the video again.
+
+        Args:
+            analyzer: The analyzer instance (unified or agentic)
+            video_uri (str): GCS URI of the video
+            index (int): 1-based position of the video in the processing list
+            total (int): Number of videos being processed
+            iterations (int): Number of analysis iterations
+            diagnostic (bool): Enable diagnostic mode
+            strategy_name (str): Name of the strategy for logging
+            video_version (str, optional): Content version of the video (see _get_blob_version)
+
+        Returns:
+            Dict: Analysis result, or an error result if the analysis failed
+        """
+        progress_label = f"[VIDEO {index}/{total}]" if diagnostic else f"[PROCESSING] Video {index}/{total}"
+        self.logger.info(f"{progress_label} {video_uri}")
+
+        cache_path, fingerprint, cached_result = self._lookup_cached_result(analyzer, video_uri, video_version,
+                                                                            iterations, strategy_name)
+        if cached_result is not None:
+            return cached_result
+
+        try:
+            # Call appropriate analysis method - both strategies now use iterations
+            result = analyzer.analyze_video_from_bucket(
+                video_uri,
+                iterations=iterations,
+                pickle_analysis=diagnostic
+            )
+
+            # Enhanced logging
+            if diagnostic:
+                self._log_diagnostic_details(result, video_uri, strategy_name)
+            else:
+                final_detection = result.get('final_detection', False)
+                final_confidence = result.get('final_confidence', 0.0)
+                self.logger.info(f"  [RESULT] detected={final_detection}, confidence={final_confidence:.3f}")
+
+            # Only successful analyses are cached, so failed videos are retried on the next run
+            if cache_path and self._is_successful_analysis(result):
+                self._store_cached_result(cache_path, fingerprint, result)
+
+            return result
+
+        except Exception as e:
+            self.logger.error(f"[ERROR] Failed to analyze {video_uri}: {e}")
+
+            return {
+                "video_identifier": video_uri,
+                "error": str(e),
+                "final_detection": False,
+                "final_confidence": 0.0,
+                "analysis_approach": f"{strategy_name}_ENHANCED"
+            }
+
+    # ===== BATCH PREDICTION METHODS =====
+
+    def _run_unified_batch_job(self, video_uris: List[str], iterations: int, batch_output_uri: str,
+                               poll_interval_seconds: int) -> Dict[str, List[str]]:
+        """
+        Submit the unified analysis of videos as a Vertex AI batch prediction job and wait for it.
+
+        Args:
+            video_uris (List[str]): GCS URIs of the videos to analyze
+            iterations (int): Number of analysis iterations per video
+            batch_output_uri (str): GCS prefix for the job's input and output files
+            poll_interval_seconds (int): Seconds between job status checks
+
+        Returns:
+            Dict[str, List[str]]: Video URI -> text of every successful response for the video
+
+        Raises:
+            RuntimeError: If the batch job does not succeed
+        """
+        from vertexai.batch_prediction import BatchPredictionJob
+
+        # Iterations are grouped into rows sampling up to candidates_per_request candidates each, like the
+        # online analysis, so the video is only read (and billed as input) once per row
+        per_request = self.shoplifting_analyzer.unified_model.candidates_per_request
+        request_sizes = [min(per_request, iterations - start) for start in range(0, iterations, per_request)]
+
+        # Build every request up-front - each row of the job input is an independent request
+        lines = []
+        for video_uri in video_uris:
+            try:
+                rows = {size: dumps_json_bytes({
+                    "request": self.shoplifting_analyzer.build_unified_batch_request(video_uri, size)
+                }) for size in set(request_sizes)}
+            except ValueError as e:
+                self.logger.error(f"[ERROR] Skipping {video_uri}: {e}")
+                continue
+            lines.extend(rows[size] for size in request_sizes)
+
+        if not lines:
+            return {}
+
+        run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        run_uri = f"{batch_output_uri.rstrip('/')}/{run_id}"
+        input_uri = f"{run_uri}/input.jsonl"
+
+        input_bucket, input_blob = self.google_client.extract_bucket_and_blob_from_gs_url(input_uri)
+        self.google_client.storage_client.bucket(input_bucket).blob(input_blob).upload_from_string(
+            b"\n".join(lines), content_type="application/jsonl", timeout=GCS_REQUEST_TIMEOUT, retry=GCS_UPLOAD_RETRY
+        )
+        self.logger.info(f"[BATCH] Uploaded {len(lines)} requests to {input_uri}")
+
+        job = BatchPredictionJob.submit(
+            source_model=self.shoplifting_analyzer.unified_model,
+            input_dataset=input_uri,
+            output_uri_prefix=run_uri,
+        )
+        self.logger.info(f"[BATCH] Submitted batch prediction job: {job.resource_name}")
+
+        while not job.has_ended:
+            time.sleep(poll_interval_seconds)
+            job.refresh()
+            self.logger.info(f"[BATCH] Job state: {job.state.name}")
+
+        if not job.has_succeeded:
+            raise RuntimeError(f"Batch prediction job {job.resource_name} did not succeed: {job.error}")
+
+        return self._read_unified_batch_responses(job.output_location)
+
+    def _read_unified_batch_responses(self, output_location: str) -> Dict[str, List[str]]:
+        """
+        Read the responses of a finished batch prediction job, grouped by video.
+
+        Args:
+            output_location (str): GCS prefix holding the job's output files
+
+        Returns:
+            Dict[str, List[str]]: Video URI -> text of every successful response for the video
+        """
+        output_bucket, output_prefix = self.google_client.extract_bucket_and_blob_from_gs_url(output_location)
+        bucket = self.google_client.storage_client.bucket(output_bucket)
+
+        output_blobs = [blob for blob in bucket.list_blobs(prefix=output_prefix, timeout=GCS_REQUEST_TIMEOUT)
+                        if blob.name.endswith(".jsonl")]
+
+        # Large jobs are split into several output files, which are downloaded concurrently (in order)
+        def download(blob) -> bytes:
+            return blob.download_as_bytes(timeout=GCS_REQUEST_TIMEOUT)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.LISTING_MAX_WORKERS, len(output_blobs)))) as executor:
+            output_files = list(executor.map(download, output_blobs))
+
+        responses_by_uri, failed_rows = self._collect_unified_batch_responses(output_files)
+        if failed_rows:
+            self.logger.warning(f"[BATCH] {failed_rows} batch requests failed and were skipped")
+        return responses_by_uri
+
+    @classmethod
+    def _collect_unified_batch_responses(cls, output_files: List[bytes]) -> Tuple[Dict[str, List[str]], int]:
+        """
+        Group the response texts of batch prediction output files by video.
+
+        Args:
+            output_files (List[bytes]): Contents of the job's JSONL output files
+
+        Returns:
+            Tuple[Dict[str, List[str]], int]: Video URI -> text of every successful response for the video,
+                and the number of failed rows
+        """
+        responses_by_uri = {}
+        failed_rows = 0
+        for output_file in output_files:
+            for line in output_file.splitlines():
+                if not line.strip():
+                    continue
+                row = loads_json(line)
+                video_uri = cls._get_batch_request_video_uri(row.get("request") or {})
+
+                # Failed rows carry a status and may have a null response
+                if row.get("status") or not video_uri:
+                    failed_rows += 1
+                    continue
+
+                candidates = (row.get("response") or {}).get("candidates") or []
+                if not candidates:
+                    failed_rows += 1
+                    continue
+
+                # Every candidate is one iteration of the analysis
+                video_responses = responses_by_uri.setdefault(video_uri, [])
+                for candidate in candidates:
+                    parts = (candidate.get("content") or {}).get("parts") or []
+                    video_responses.append("".join(part.get("text") or "" for part in parts))
+
+        return responses_by_uri, failed_rows
+
+    @staticmethod
+    def _get_batch_request_video_uri(request: Dict) -> Optional[str]:
+        """Get the URI of the video referenced by a batch prediction request."""
+        for content in request.get("contents") or []:
+            for part in content.get("parts") or []:
+                # Text parts are echoed back with a null fileData
+                file_uri = (part.get("fileData") or {}).get("fileUri")
+                if file_uri:
+                    return file_uri
+        return None
+
     # ===== UTILITY METHODS =====
 
     def _get_video_uris_from_bucket(self, bucket_name: str) -> List[str]:
-        """Get list of video URIs from GCS bucket using existing GoogleClient authentication."""
+        """
+        Get list of video URIs from GCS bucket using existing GoogleClient authentication.
+
+        Args:
+            bucket_name (str): GCS bucket containing videos
+
+        Returns:
+            List[str]: Video URIs, in the bucket's lexicographic order
+        """
+        return list(self._get_video_versions_from_bucket(bucket_name))
+
+    def _get_video_versions_from_bucket(self, bucket_name: str) -> Dict[str, str]:
+        """
+        Get the video URIs in a GCS bucket together with the content version of each video.
+
+        The bucket root is listed once with a "/" delimiter to discover its top-level folders,
+        and every folder is then listed concurrently, so buckets holding many video folders
+        are not walked page by page in a single serial listing.
+
+        Args:
+            bucket_name (str): GCS bucket containing videos
+
+        Returns:
+            Dict[str, str]: Video URI -> content version, in the bucket's lexicographic order
+        """
         try:
             storage_client = self.google_client.storage_client
             bucket = storage_client.bucket(bucket_name)
 
-            video_extensions = {'.mp4', '.avi'}
-            video_uris = []
-
             self.logger.info(f"Listing blobs in bucket: {bucket_name}")
 
-            for blob in bucket.list_blobs():
-                if any(blob.name.lower().endswith(ext) for ext in video_extensions):
-                    video_uri = f"gs://{bucket_name}/{blob.name}"
-                    video_uris.append(video_uri)
-                    if self.logger:
-                        self.logger.debug(f"Found video: {video_uri}")
+            # Root-level blobs are returned directly, sub-folders are only reported as prefixes
+            root_listing = bucket.list_blobs(delimiter="/", fields=f"items({self.LISTING_BLOB_FIELDS}),prefixes,"
+                                                                  f"nextPageToken", timeout=GCS_REQUEST_TIMEOUT)
+            video_versions = {blob.name: self._get_blob_version(blob) for blob in root_listing
+                              if blob.name.lower().endswith(self.VIDEO_EXTENSIONS)}
+            # Listing order doesn't matter here, the combined result is sorted once below
+            prefixes = list(root_listing.prefixes)
+
+            if prefixes:
+                with ThreadPoolExecutor(max_workers=min(self.LISTING_MAX_WORKERS, len(prefixes))) as executor:
+                    for prefix_video_versions in executor.map(lambda prefix: self._list_video_versions(bucket, prefix),
+                                                              prefixes):
+                        video_versions.update(prefix_video_versions)
+
+            # Keep the same ordering a single flat listing would have produced (each listing is already
+            # sorted, so this only merges the sorted runs)
+            video_versions = {f"gs://{bucket_name}/{name}": video_versions[name] for name in sorted(video_versions)}
 
             if self.logger:
-                self.logger.info(f"Found {len(video_uris)} video files")
-            return video_uris
+                self.logger.info(f"Found {len(video_versions)} video files")
+            return video_versions
 
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Failed to list videos from bucket: {e}")
-            return []
+            return {}
+
+    def _list_video_versions(self, bucket, prefix: str) -> Dict[str, str]:
+        """
+        List the video blobs under a single bucket prefix.
+
+        Args:
+            bucket: GCS bucket object
+            prefix (str): Folder prefix to list (e.g. "store_1/")
+
+        Returns:
+            Dict[str, str]: Video blob name -> content version
+        """
+        return {blob.name: self._get_blob_version(blob)
+                for blob in bucket.list_blobs(prefix=prefix, fields=f"items({self.LISTING_BLOB_FIELDS}),nextPageToken",
+                                              timeout=GCS_REQUEST_TIMEOUT)
+                if blob.name.lower().endswith(self.VIDEO_EXTENSIONS)}
+
+    @staticmethod
+    def _get_blob_version(blob) -> str:
+        """
+        Identify the content of a listed blob.
+
+        The MD5 hash identifies the video bytes themselves, so identical videos share cached results
+        regardless of their name. Composite objects have no MD5 hash and fall back to the object generation.
+
+        Args:
+            blob: GCS blob returned by a listing
+
+        Returns:
+            str: "md5:<hash>" or "generation:<generation>"
+        """
+        if blob.md5_hash:
+            return f"md5:{blob.md5_hash}"
+        return f"generation:{blob.generation}"
+
+    # ===== RESULTS CACHE METHODS =====
+
+    def _lookup_cached_result(self, analyzer, video_uri: str, video_version: Optional[str], iterations: int,
+                              strategy_name: str) -> Tuple[Optional[str], Optional[str], Optional[Dict]]:
+        """
+        Look up the cached result of a video analysis.
+
+        Args:
+            analyzer: The analyzer instance (unified or agentic)
+            video_uri (str): GCS URI of the video
+            video_version (str, optional): Content version of the video (see _get_blob_version)
+            iterations (int): Number of analysis iterations
+            strategy_name (str): Name of the strategy
+
+        Returns:
+            Tuple[Optional[str], Optional[str], Optional[Dict]]: (cache_path, fingerprint, cached_result).
+                All None when no results cache is configured; cached_result is None on a miss or when
+                re-analysis is forced.
+        """
+        if not self.results_cache_dir:
+            return None, None, None
+
+        fingerprint = self._get_analysis_fingerprint(analyzer, video_uri, video_version, iterations, strategy_name)
+        cache_path = self._get_results_cache_path(fingerprint, strategy_name)
+        if self.force_reanalysis:
+            return cache_path, fingerprint, None
+
+        cached_result = self._load_cached_result(cache_path, fingerprint)
+        if cached_result is None:
+            return cache_path, fingerprint, None
+
+        self.logger.info(f"  [CACHED] Reusing previous analysis of identical video content: {video_uri}")
+        # The cached result may come from a copy of this video stored under another name
+        return cache_path, fingerprint, dict(cached_result, video_identifier=video_uri)
+
+    def _get_results_cache_path(self, fingerprint: str, strategy_name: str) -> str:
+        """
+        Get the path of the cached result file for an analysis.
+
+        Args:
+            fingerprint (str): Fingerprint of the analysis inputs
+            strategy_name (str): Name of the strategy
+
+        Returns:
+            str: Path of the cache file inside the results cache directory
+        """
+        return os.path.join(self.results_cache_dir, f"{strategy_name.lower()}_{fingerprint}.json")
+
+    @staticmethod
+    def _get_analysis_fingerprint(analyzer, video_uri: str, video_version: Optional[str], iterations: int,
+                                  strategy_name: str) -> str:
+        """
+        Fingerprint the inputs of a video analysis, so a cached result is only reused when the video,
+        the analysis settings, the models and the prompts are unchanged. Videos with a content hash are identified by their
+        content alone, so the same video uploaded under several names is analyzed once.
+
+        Args:
+            analyzer: The analyzer instance (unified or agentic)
+            video_uri (str): GCS URI of the video
+            video_version (str, optional): Content version of the video (see _get_blob_version)
+            iterations (int): Number of analysis iterations
+            strategy_name (str): Name of the strategy
+
+        Returns:
+            str: Hex digest identifying the analysis inputs
+        """
+        if video_version and video_version.startswith("md5:"):
+            video_key = [video_version]
+        else:
+            video_key = [video_uri, video_version]
+
+        settings = [strategy_name, iterations, getattr(analyzer, 'shoplifting_detection_threshold', None),
+                    getattr(analyzer, 'early_stop_iterations', None), ANALYSIS_PROMPTS_DIGEST]
+
+        # Switching a model (e.g. to a tuned endpoint) or its instructions and generation settings changes
+        # the analysis. The SDK only exposes these as private attributes.
+        for model_attribute in ('unified_model', 'cv_model', 'analysis_model'):
+            model = getattr(analyzer, model_attribute, None)
+            if model is not None:
+                settings.append([model_attribute, getattr(model, '_model_name', None),
+                                 str(getattr(model, '_system_instruction', None)),
+                                 str(getattr(model, '_generation_config', None))])
+
+        key = json.dumps(video_key + settings)
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _is_successful_analysis(result: Dict) -> bool:
+        """
+        Check whether an analysis succeeded, so its result may be cached. An analysis with a failed
+        iteration (e.g. an unparsable model response) is not cached, so the video is retried on the next run.
+
+        Args:
+            result (Dict): Analysis result
+
+        Returns:
+            bool: True if neither the analysis nor any of its iterations failed
+        """
+        if 'error' in result:
+            return False
+
+        for iteration in result.get('iteration_results') or []:
+            detailed_analysis = iteration.get('detailed_analysis') or {}
+            if 'error' in detailed_analysis or detailed_analysis.get('evidence_tier') == 'ERROR':
+                return False
+        return True
+
+    def _load_cached_result(self, cache_path: str, fingerprint: str) -> Optional[Dict]:
+        """
+        Load a cached analysis result if it exists and matches the fingerprint.
+
+        Args:
+            cache_path (str): Path of the cache file
+            fingerprint (str): Expected fingerprint of the analysis inputs
+
+        Returns:
+            Optional[Dict]: The cached result, or None if missing, stale or unreadable
+        """
+        try:
+            with open(cache_path, "rb") as f:
+                cached = loads_json(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable results cache file {cache_path}: {e}")
+            return None
+
+        if cached.get("fingerprint") != fingerprint:
+            return None
+        return cached.get("result")
+
+    def _store_cached_result(self, cache_path: str, fingerprint: str, result: Dict) -> None:
+        """
+        Store an analysis result in the results cache.
+
+        Args:
+            cache_path (str): Path of the cache file
+            fingerprint (str): Fingerprint of the analysis inputs
+            result (Dict): Analysis result to cache
+        """
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Written atomically, so an interrupted run never leaves a truncated cache file behind
+            write_json_atomic(cache_path, {"fingerprint": fingerprint, "result": result}, default=self._json_default)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"Failed to cache result in {cache_path}: {e}")
+
+    @staticmethod
+    def _json_default(value):
+        """Convert numpy scalars (and anything else json cannot encode) for the results cache."""
+        if isinstance(value, np.generic):
+            return value.item()
+        return str(value)
 
     def _log_diagnostic_details(self, result: Dict, video_uri: str, strategy_name: str):
         """Log detailed information for diagnostic mode"""
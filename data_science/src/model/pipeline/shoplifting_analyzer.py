@@ -6,26 +6,72 @@ from data_science.src.utils import get_video_extension, AGENTIC_MODEL, UNIFIED_M
 import os
 from vertexai.generative_models import Part
 from typing import List, Dict, Any
-from utils import create_logger
+from utils import create_logger, write_bytes_atomic, KeywordMatcher
 
 import numpy as np
 import pickle
 import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 
 
-def create_unified_analyzer(detection_threshold: float, logger: logging.Logger = None):
+@lru_cache(maxsize=None)
+def get_shared_unified_model() -> UnifiedShopliftingModel:
+    """
+    Get the process-wide UnifiedShopliftingModel instance.
+
+    Vertex AI models open their prediction client (and its connection channel) lazily per instance,
+    so reusing one instance across analyzers reuses the same open connection instead of setting up
+    a new one for every analyzer.
+
+    Returns:
+        UnifiedShopliftingModel: Shared unified model
+    """
+    return UnifiedShopliftingModel()
+
+
+@lru_cache(maxsize=None)
+def get_shared_cv_model() -> ComputerVisionModel:
+    """
+    Get the process-wide ComputerVisionModel instance.
+
+    Returns:
+        ComputerVisionModel: Shared computer vision model
+    """
+    return ComputerVisionModel()
+
+
+@lru_cache(maxsize=None)
+def get_shared_analysis_model() -> AnalysisModel:
+    """
+    Get the process-wide AnalysisModel instance.
+
+    Returns:
+        AnalysisModel: Shared analysis model
+    """
+    return AnalysisModel()
+
+
+def create_unified_analyzer(detection_threshold: float, logger: logging.Logger = None,
+                            candidates_per_request: int = 1):
     """
     Factory function to create a unified strategy analyzer.
 
     Args:
         detection_threshold (float): Detection confidence threshold
         logger (logging.Logger, optional): Logger instance
+        candidates_per_request (int, optional): Number of analysis iterations sampled per model request.
+            Defaults to 1.
 
     Returns:
         ShopliftingAnalyzer: Configured for unified strategy
     """
-    # Create the unified model instance
-    unified_model = UnifiedShopliftingModel()
+    if candidates_per_request == 1:
+        # Reuse the shared unified model instance (and its open prediction client)
+        unified_model = get_shared_unified_model()
+    else:
+        unified_model = UnifiedShopliftingModel(candidates_per_request=candidates_per_request)
 
     return ShopliftingAnalyzer(
         detection_strictness=detection_threshold,
@@ -35,27 +81,36 @@ def create_unified_analyzer(detection_threshold: float, logger: logging.Logger =
     )
 
 
-def create_agentic_analyzer(detection_threshold: float, logger: logging.Logger = None):
+def create_agentic_analyzer(detection_threshold: float, logger: logging.Logger = None,
+                            candidates_per_request: int = 1, early_stop_iterations: int = None):
     """
     Factory function to create an agentic strategy analyzer.
 
     Args:
         detection_threshold (float): Detection confidence threshold
         logger (logging.Logger, optional): Logger instance
+        candidates_per_request (int, optional): Number of CV observation samples generated per model request.
+            Defaults to 1.
+        early_stop_iterations (int, optional): Stop analyzing a video once this many consecutive iterations
+            agree with confidence at or above the detection threshold. Defaults to None (run all iterations).
 
     Returns:
         ShopliftingAnalyzer: Configured for agentic strategy
     """
-    # Create the required model instances for agentic strategy
-    cv_model = ComputerVisionModel()
-    analysis_model = AnalysisModel()
+    # Reuse the shared model instances required for agentic strategy (and their open prediction clients)
+    if candidates_per_request == 1:
+        cv_model = get_shared_cv_model()
+    else:
+        cv_model = ComputerVisionModel(candidates_per_request=candidates_per_request)
+    analysis_model = get_shared_analysis_model()
 
     return ShopliftingAnalyzer(
         detection_strictness=detection_threshold,
         logger=logger,
         strategy=AGENTIC_MODEL,
         cv_model=cv_model,
-        analysis_model=analysis_model
+        analysis_model=analysis_model,
+        early_stop_iterations=early_stop_iterations
     )
 
 
@@ -93,6 +148,10 @@ class ShopliftingAnalyzer:
         'returned', 'shelf', 'checkout', 'natural', 'regular'
     ]
 
+    # Precompiled matchers finding all indicators of a list in one scan of the text
+    THEFT_INDICATOR_MATCHER = KeywordMatcher(THEFT_INDICATORS)
+    NORMAL_INDICATOR_MATCHER = KeywordMatcher(NORMAL_INDICATORS)
+
     ANALYSIS_DICT = {
         "video_identifier": str(),
         "analysis_approach": str(),
@@ -108,7 +167,8 @@ class ShopliftingAnalyzer:
 
     def __init__(self, detection_strictness: float, strategy: str = UNIFIED_MODEL,
                  unified_model: UnifiedShopliftingModel = None, cv_model: ComputerVisionModel = None,
-                 analysis_model: AnalysisModel = None, logger: logging.Logger = None):
+                 analysis_model: AnalysisModel = None, logger: logging.Logger = None,
+                 early_stop_iterations: int = None):
         """
         Initialize the ShopliftingAnalyzer with support for both unified and agentic strategies.
 
@@ -119,6 +179,9 @@ class ShopliftingAnalyzer:
             cv_model (ComputerVisionModel, optional): Computer vision model for video analysis
             analysis_model (AnalysisModel, optional): Analysis model for interpreting observations
             logger (logging.Logger, optional): Logger instance
+            early_stop_iterations (int, optional): Agentic strategy only - stop analyzing a video once this many
+                consecutive iterations agree on the detection with confidence at or above detection_strictness.
+                Defaults to None (always run all iterations).
         """
         self.strategy = strategy
 
@@ -141,7 +204,11 @@ class ShopliftingAnalyzer:
             if not hasattr(self, 'unified_model') or not self.unified_model:
                 raise ValueError("Unified analysis requires UnifiedShopliftingModel")
 
+        if early_stop_iterations is not None and early_stop_iterations < 1:
+            raise ValueError("early_stop_iterations must be at least 1.")
+
         self.shoplifting_detection_threshold = detection_strictness
+        self.early_stop_iterations = early_stop_iterations
 
         # Initialize logger
         if logger is None:
@@ -229,13 +296,61 @@ class ShopliftingAnalyzer:
         try:
             # Validate video format
             extension = self._validate_video_format(video_path)
-            video_part = Part.from_data(mime_type=self.VIDEO_MIME_TYPES[extension], data=open(video_path, "rb").read())
+            with open(video_path, "rb") as video_file:
+                video_part = Part.from_data(mime_type=self.VIDEO_MIME_TYPES[extension], data=video_file.read())
             return self._analyze_video(video_path, video_part, iterations, pickle_analysis)
 
         except Exception as e:
             self.logger.error(f"Failed to analyze {video_path}: {e}")
             return self._create_error_result(video_path, str(e))
 
+    def build_unified_batch_request(self, video_uri: str, candidate_count: int = 1) -> Dict:
+        """
+        Build the batch prediction request of unified analysis iterations for a bucket video.
+
+        Args:
+            video_uri (str): GCS URI of the video
+            candidate_count (int, optional): Number of iterations sampled as candidates of the request.
+                Defaults to 1.
+
+        Returns:
+            Dict: GenerateContent request in JSON form
+
+        Raises:
+            ValueError: If the analyzer isn't configured for the unified strategy or the video format is unsupported
+        """
+        if self.strategy != UNIFIED_MODEL:
+            raise ValueError("Batch requests are only supported for the unified strategy")
+
+        extension = self._validate_video_format(video_uri)
+        video_part = Part.from_uri(uri=video_uri, mime_type=self.VIDEO_MIME_TYPES[extension])
+        return self.unified_model.build_batch_request(video_part, candidate_count=candidate_count)
+
+    def analyze_unified_batch_responses(self, video_uri: str, response_texts: List[str],
+                                        pickle_analysis: bool = False) -> Dict:
+        """
+        Compile the unified analysis of a bucket video from its batch prediction responses.
+
+        Args:
+            video_uri (str): GCS URI of the video
+            response_texts (List[str]): Text of every model response for the video (one per iteration)
+            pickle_analysis (bool): Whether to save analysis results
+
+        Returns:
+            Dict: Analysis results
+        """
+        try:
+            return self.unified_model.analyze_batch_responses(
+                video_identifier=video_uri,
+                response_texts=response_texts,
+                detection_threshold=self.shoplifting_detection_threshold,
+                logger=self.logger,
+                pickle_analysis=pickle_analysis
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to compile batch analysis of {video_uri}: {e}")
+            return self._create_error_result(video_uri, str(e))
+
     def _analyze_video(self, video_path: str, video_part: Part, iterations: int, pickle_analysis: bool = True):
         """
         Analyze video file by strategy.
@@ -324,52 +439,95 @@ class ShopliftingAnalyzer:
         all_detections = []
         cv_observations = []
         analysis_details = []
-
-        for i in range(iterations):
-            self.logger.info(f"=== AGENTIC ITERATION {i + 1}/{iterations} ===")
-
-            # Step 1: Computer Vision Model - Get detailed observations
-            self.logger.info(f"Step 1: Getting detailed observations from CV model...")
-
-            # Get structured observations for better analysis
-            structured_obs = self.cv_model.analyze_video_structured(video_part)
-            cv_observations.append(str(structured_obs))  # Store structured obs as string for logging
-
-            self.logger.info(f"CV Model Observations Length: {len(str(structured_obs))} characters")
-            self.logger.debug(f"CV Observations Preview: {str(structured_obs)[:200]}...")
-
-            # Step 2: Analysis Model - Make decision based on observations
-            self.logger.info(f"Step 2: Analysis model making decision...")
-            analysis_response, detected, confidence, detailed_analysis = self.analysis_model.analyze_structured_observations(
-                video_part, structured_obs
-            )
-
-            analysis_details.append(detailed_analysis)
-
-            self.logger.info(f"Analysis Result - Iteration {i + 1}:")
-            self.logger.info(f"  Detected: {detected}")
-            self.logger.info(f"  Confidence: {confidence:.3f}")
-            self.logger.info(f"  Evidence Tier: {detailed_analysis.get('evidence_tier', 'N/A')}")
-            self.logger.info(f"  Key Behaviors: {detailed_analysis.get('key_behaviors', [])}")
-
-            if detailed_analysis.get('concealment_actions'):
-                self.logger.info(f"  Concealment Actions: {detailed_analysis['concealment_actions']}")
-
-            # Store iteration results
-            iteration_result = {
-                'iteration': i + 1,
-                'cv_observations': str(structured_obs),
-                'structured_observations': structured_obs,
-                'analysis_response': analysis_response,
-                'detected': detected,
-                'confidence': confidence,
-                'detailed_analysis': detailed_analysis,
-                'timestamp': datetime.datetime.now().isoformat()
-            }
-
-            iteration_results.append(iteration_result)
-            all_confidences.append(confidence)
-            all_detections.append(detected)
+        agreeing_iterations = 0
+
+        # CV observations are requested in groups of up to candidates_per_request samples per model call
+        per_request = self.cv_model.candidates_per_request
+        observation_request_sizes = iter([min(per_request, iterations - start)
+                                          for start in range(0, iterations, per_request)])
+        ready_observations = deque()
+
+        # The CV observations of an iteration don't depend on earlier iterations, so the next CV call is
+        # started in the background while the analysis calls of the current iterations run
+        with ThreadPoolExecutor(max_workers=1) as cv_executor:
+            def request_observations():
+                request_size = next(observation_request_sizes, None)
+                return cv_executor.submit(self.cv_model.analyze_video_structured_samples, video_part,
+                                          request_size) if request_size else None
+
+            pending_observations = request_observations()
+
+            for i in range(iterations):
+                self.logger.info("=== AGENTIC ITERATION %d/%d ===", i + 1, iterations)
+
+                # Step 1: Computer Vision Model - Get detailed observations
+                self.logger.info("Step 1: Getting detailed observations from CV model...")
+
+                # Get structured observations for better analysis
+                if not ready_observations:
+                    if pending_observations is None:
+                        pending_observations = request_observations()
+                    ready_observations.extend(pending_observations.result())
+
+                    # Don't prefetch when the analysis may stop early within these observations - the
+                    # prefetched CV call would be unused, and leaving the executor would still wait for it
+                    if self.early_stop_iterations and \
+                            agreeing_iterations + len(ready_observations) >= self.early_stop_iterations:
+                        pending_observations = None
+                    else:
+                        pending_observations = request_observations()
+                structured_obs = ready_observations.popleft()
+                observations_text = str(structured_obs)
+                cv_observations.append(observations_text)  # Store structured obs as string for logging
+
+                # Lazy formatting - the preview is only truncated when debug logging is enabled
+                self.logger.info("CV Model Observations Length: %d characters", len(observations_text))
+                self.logger.debug("CV Observations Preview: %.200s...", observations_text)
+
+                # Step 2: Analysis Model - Make decision based on observations
+                self.logger.info("Step 2: Analysis model making decision...")
+                analysis_response, detected, confidence, detailed_analysis = self.analysis_model.analyze_structured_observations(
+                    video_part, structured_obs
+                )
+
+                analysis_details.append(detailed_analysis)
+
+                self.logger.info("Analysis Result - Iteration %d:", i + 1)
+                self.logger.info("  Detected: %s", detected)
+                self.logger.info("  Confidence: %.3f", confidence)
+                self.logger.info("  Evidence Tier: %s", detailed_analysis.get('evidence_tier', 'N/A'))
+                self.logger.info("  Key Behaviors: %s", detailed_analysis.get('key_behaviors', []))
+
+                if detailed_analysis.get('concealment_actions'):
+                    self.logger.info("  Concealment Actions: %s", detailed_analysis['concealment_actions'])
+
+                # Store iteration results
+                iteration_result = {
+                    'iteration': i + 1,
+                    'cv_observations': observations_text,
+                    'structured_observations': structured_obs,
+                    'analysis_response': analysis_response,
+                    'detected': detected,
+                    'confidence': confidence,
+                    'detailed_analysis': detailed_analysis,
+                    'timestamp': datetime.datetime.now().isoformat()
+                }
+
+                iteration_results.append(iteration_result)
+                all_confidences.append(confidence)
+                all_detections.append(detected)
+
+                # Count the confident iterations in a row that agree with the previous ones
+                if confidence >= self.shoplifting_detection_threshold:
+                    agreeing_iterations = agreeing_iterations + 1 if i and detected == all_detections[-2] else 1
+                else:
+                    agreeing_iterations = 0
+
+                if self.early_stop_iterations and agreeing_iterations >= self.early_stop_iterations \
+                        and i + 1 < iterations:
+                    self.logger.info("Stopping early after %d/%d iterations: %d consecutive confident iterations "
+                                     "agree (detected=%s)", i + 1, iterations, agreeing_iterations, detected)
+                    break
 
         # Enhanced final decision using AnalysisModel's surveillance-realistic logic
         self.logger.info("=== MAKING FINAL DECISION ===")
@@ -389,7 +547,7 @@ class ShopliftingAnalyzer:
         results = {
             "video_identifier": video_identifier,
             "analysis_approach": AGENTIC_MODEL,
-            "iterations": iterations,
+            "iterations": len(iteration_results),
             "final_detection": final_detection,
             "final_confidence": final_confidence,
             "decision_reasoning": decision_reasoning,
@@ -406,7 +564,7 @@ class ShopliftingAnalyzer:
         # Performance summary
         self.logger.info(f"=== AGENTIC ANALYSIS COMPLETE ===")
         self.logger.info(f"Video: {video_identifier}")
-        self.logger.info(f"Iterations: {iterations}")
+        self.logger.info(f"Iterations: {len(iteration_results)}/{iterations}")
         self.logger.info(f"Confidence Range: {min(all_confidences):.3f} - {max(all_confidences):.3f}")
         self.logger.info(f"Detection Consistency: {sum(all_detections)}/{len(all_detections)}")
 
@@ -431,8 +589,8 @@ class ShopliftingAnalyzer:
         all_text = " ".join(observations).lower()
 
         # Use consolidated behavioral indicators from class constants
-        suspicious_count = sum(1 for keyword in self.THEFT_INDICATORS if keyword in all_text)
-        normal_count = sum(1 for keyword in self.NORMAL_INDICATORS if keyword in all_text)
+        suspicious_count = self.THEFT_INDICATOR_MATCHER.count(all_text)
+        normal_count = self.NORMAL_INDICATOR_MATCHER.count(all_text)
 
         return {
             "total_observations": len(observations),
@@ -487,12 +645,12 @@ class ShopliftingAnalyzer:
             analysis (Dict): Analysis results to save
         """
         try:
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            # Microseconds keep file names unique when several videos are analyzed concurrently
+            current_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
             strategy_prefix = self.strategy if self.strategy != UNIFIED_MODEL else UNIFIED_MODEL
             pkl_path = f"{strategy_prefix}_analysis_{current_time}.pkl"
 
-            with open(pkl_path, 'wb') as file:
-                pickle.dump(analysis, file)
+            write_bytes_atomic(pkl_path, pickle.dumps(analysis))
 
             self.logger.info(f"Analysis saved to pickle file: {pkl_path}")
 
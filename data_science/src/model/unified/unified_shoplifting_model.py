@@ -14,12 +14,14 @@ import json
 import logging
 import datetime
 import pickle
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from google.protobuf import json_format
 
 from data_science.src.model.unified.prompt.unified_prompt import default_response_schema, default_system_instruction, \
     unified_prompt
+from data_science.src.model.generation_config_utils import with_candidate_count
 from data_science.src.utils import UNIFIED_MODEL
-from utils import load_env_variables
+from utils import load_env_variables, write_bytes_atomic, loads_json, call_with_retry, KeywordMatcher
 
 load_env_variables()
 
@@ -33,6 +35,10 @@ class UnifiedShopliftingModel(GenerativeModel):
     eliminating information loss and using few-shot learning with real examples.
     """
 
+    # Iterations of a video are independent model calls, so they are sent concurrently (bounded, to stay
+    # well within the per-minute quota when several videos are analyzed in parallel)
+    MAX_CONCURRENT_ITERATIONS = 3
+
     # Consolidated behavioral indicators
     THEFT_INDICATORS = [
         'pocket', 'bag', 'waist', 'concealed', 'hidden', 'tucked',
@@ -46,6 +52,10 @@ class UnifiedShopliftingModel(GenerativeModel):
         'returned', 'shelf', 'checkout', 'natural', 'regular'
     ]
 
+    # Precompiled matchers finding all indicators of a list in one scan of the text
+    THEFT_INDICATOR_MATCHER = KeywordMatcher(THEFT_INDICATORS)
+    NORMAL_INDICATOR_MATCHER = KeywordMatcher(NORMAL_INDICATORS)
+
     default_generation_config = GenerationConfig(
         temperature=0.05,  # Much lower for more consistent, conservative responses
         top_p=0.7,  # More focused on high-probability responses
@@ -69,7 +79,14 @@ class UnifiedShopliftingModel(GenerativeModel):
                  generation_config: Optional[GenerationConfigType] = None,
                  safety_settings: Optional[SafetySettingsType] = None,
                  system_instruction: Optional[PartsType] = None,
-                 labels: Optional[Dict[str, str]] = None):
+                 labels: Optional[Dict[str, str]] = None,
+                 candidates_per_request: int = 1):
+        """
+        Args:
+            candidates_per_request (int, optional): Number of analysis iterations sampled per request.
+                Defaults to 1 (one request per iteration).
+        """
+        self.candidates_per_request = max(1, candidates_per_request)
 
         if system_instruction is None:
             system_instruction = default_system_instruction
@@ -99,21 +116,94 @@ class UnifiedShopliftingModel(GenerativeModel):
         contents = [video_file, prompt]
 
         # Single model call - no information loss!
-        response = self.generate_content(
+        response = call_with_retry(lambda: self.generate_content(
             contents,
             generation_config=self._generation_config,
             safety_settings=self._safety_settings
-        )
+        ))
 
         # Extract structured results
         detected, confidence, analysis = self._extract_unified_response(response)
 
         return response.text, detected, confidence, analysis
 
+    def analyze_video_unified_candidates(self, video_file: Part, candidate_count: int,
+                                         prompt: str = None) -> List[Tuple[str, bool, float, dict]]:
+        """
+        UNIFIED analysis sampled several times with a single request, one result per response candidate.
+
+        Args:
+            video_file (Part): Video file part object
+            candidate_count (int): Number of candidates (independent analyses) to generate
+            prompt (str, optional): Custom prompt. Uses the unified prompt if None.
+
+        Returns:
+            List[Tuple[str, bool, float, dict]]: (full_response, detected, confidence, detailed_analysis) per candidate
+
+        Raises:
+            ValueError: If the response holds fewer candidates than requested (e.g. blocked by the safety filters)
+        """
+        if prompt is None:
+            prompt = unified_prompt
+
+        contents = [video_file, prompt]
+
+        response = call_with_retry(lambda: self.generate_content(
+            contents,
+            generation_config=with_candidate_count(self._generation_config, candidate_count),
+            safety_settings=self._safety_settings
+        ))
+
+        if len(response.candidates) < candidate_count:
+            raise ValueError(f"Expected {candidate_count} response candidates, got {len(response.candidates)}")
+
+        results = []
+        for candidate in response.candidates:
+            detected, confidence, analysis = self._parse_unified_response_text(candidate.text)
+            results.append((candidate.text, detected, confidence, analysis))
+        return results
+
+    def build_batch_request(self, video_file: Part, prompt: str = None, candidate_count: int = 1) -> Dict:
+        """
+        Build the request of a single unified analysis as a batch prediction JSON row body.
+
+        The request is prepared by the SDK exactly like the online call in analyze_video_unified
+        (system instruction, generation config and safety settings included), then converted to the
+        JSON form expected by Vertex AI batch prediction.
+
+        Args:
+            video_file (Part): Video file part object (must reference a GCS URI)
+            prompt (str, optional): Custom prompt. Uses the unified prompt if None.
+            candidate_count (int, optional): Number of independent analyses sampled by the request,
+                each returned as its own candidate. Defaults to 1.
+
+        Returns:
+            Dict: GenerateContent request in JSON form
+        """
+        if prompt is None:
+            prompt = unified_prompt
+
+        generation_config = (with_candidate_count(self._generation_config, candidate_count) if candidate_count > 1
+                             else self._generation_config)
+        request = self._prepare_request(
+            contents=[video_file, prompt],
+            generation_config=generation_config,
+            safety_settings=self._safety_settings
+        )
+        request_json = json_format.MessageToDict(type(request).pb(request))
+
+        # The batch job itself defines which model serves the requests
+        request_json.pop("model", None)
+        return request_json
+
     def _extract_unified_response(self, response: GenerationResponse) -> Tuple[bool, float, dict]:
         """Extract detection results from unified model response."""
+        return self._parse_unified_response_text(response.text)
+
+    def _parse_unified_response_text(self, response_text: str) -> Tuple[bool, float, dict]:
+        """Extract detection results from the text of a unified model response."""
         try:
-            response_json = json.loads(response.text)
+            response_json = loads_json(response_text)
 
             detected = response_json["Shoplifting Detected"]
             confidence = response_json["Confidence Level"]
@@ -177,6 +267,61 @@ class UnifiedShopliftingModel(GenerativeModel):
 
         return analysis_results
 
+    def analyze_batch_responses(self, video_identifier: str, response_texts: List[str], detection_threshold: float,
+                                logger: logging.Logger = None, pickle_analysis: bool = False) -> Dict:
+        """
+        Build the unified analysis of a video from responses produced by a batch prediction job.
+        Each response is treated as one iteration, and the final decision is made exactly like in
+        analyze_video.
+
+        Args:
+            video_identifier (str): Video identifier
+            response_texts (List[str]): Text of every model response for the video (one per iteration)
+            detection_threshold (float): Detection confidence threshold
+            logger (logging.Logger, optional): Logger instance
+            pickle_analysis (bool): Whether to save results
+
+        Returns:
+            Dict: Analysis results
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+
+        iterations = len(response_texts)
+        logger.info(f"Compiling UNIFIED batch analysis of '{video_identifier}' from {iterations} responses")
+
+        iteration_results = []
+        all_confidences = []
+        all_detections = []
+
+        for i, full_response in enumerate(response_texts):
+            detected, confidence, detailed_analysis = self._parse_unified_response_text(full_response)
+            self._log_iteration_analysis(i + 1, video_identifier, detected, confidence, detailed_analysis, logger)
+
+            iteration_results.append({
+                "iteration": i + 1,
+                "detected": detected,
+                "confidence": confidence,
+                "detailed_analysis": detailed_analysis,
+                "full_response": full_response
+            })
+            all_confidences.append(confidence)
+            all_detections.append(detected)
+
+        final_confidence, final_detection, decision_reasoning = self._make_unified_final_decision(
+            all_confidences, all_detections, detection_threshold, logger
+        )
+
+        analysis_results = self._compile_results_schema(
+            video_identifier, iterations, iteration_results, all_confidences,
+            all_detections, final_confidence, final_detection, decision_reasoning, logger
+        )
+
+        if pickle_analysis:
+            self._save_analysis_to_pickle(analysis_results, logger)
+
+        return analysis_results
+
     def _process_unified_iterations(self, video_part: Part, video_identifier: str, iterations: int,
                                     logger: logging.Logger) -> Tuple[List[Dict], List[float], List[bool]]:
         """
@@ -195,11 +340,25 @@ class UnifiedShopliftingModel(GenerativeModel):
         all_confidences = []
         all_detections = []
 
-        for i in range(iterations):
-            logger.info(f"Iteration {i + 1}/{iterations}")
+        logger.info(f"Running {iterations} iterations")
 
-            # Single unified model call - direct video→detection!
-            full_response, detected, confidence, detailed_analysis = self.analyze_video_unified(video_part)
+        # Iterations are grouped into requests of up to candidates_per_request candidates each
+        request_sizes = [min(self.candidates_per_request, iterations - start)
+                         for start in range(0, iterations, self.candidates_per_request)]
+
+        # Direct video→detection model calls! Transient API errors are already retried with backoff
+        # inside the analysis calls.
+        max_workers = max(1, min(self.MAX_CONCURRENT_ITERATIONS, len(request_sizes)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = [response
+                         for request_responses in executor.map(
+                             lambda candidate_count: self._analyze_video_unified_samples(video_part, candidate_count),
+                             request_sizes)
+                         for response in request_responses]
+
+        # Results are logged and stored in iteration order
+        for i, (full_response, detected, confidence, detailed_analysis) in enumerate(responses):
+            logger.info("Iteration %d/%d", i + 1, iterations)
 
             # Log and analyze this iteration
             self._log_iteration_analysis(i + 1, video_identifier, detected, confidence, detailed_analysis, logger)
@@ -218,6 +377,13 @@ class UnifiedShopliftingModel(GenerativeModel):
 
         return iteration_results, all_confidences, all_detections
 
+    def _analyze_video_unified_samples(self, video_part: Part,
+                                       candidate_count: int) -> List[Tuple[str, bool, float, dict]]:
+        """Run one unified analysis request producing candidate_count iteration results."""
+        if candidate_count == 1:
+            return [self.analyze_video_unified(video_part)]
+        return self.analyze_video_unified_candidates(video_part, candidate_count)
+
     def _log_iteration_analysis(self, iteration: int, video_identifier: str, detected: bool,
                                 confidence: float, detailed_analysis: Dict, logger: logging.Logger):
         """
@@ -231,29 +397,33 @@ class UnifiedShopliftingModel(GenerativeModel):
             detailed_analysis (Dict): Detailed analysis results
             logger (logging.Logger): Logger instance
         """
-        logger.info(f"[CONFIDENCE] Using original unified model confidence: {confidence:.3f}")
+        # Diagnostics (including the behavioral pattern scan) are only computed when they would be logged
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
+        logger.info("[CONFIDENCE] Using original unified model confidence: %.3f", confidence)
 
         # ENHANCED DIAGNOSTIC LOGGING
-        logger.info(f"=== DIAGNOSTIC ANALYSIS - Iteration {iteration} ===")
-        logger.info(f"Video: {video_identifier}")
-        logger.info(f"Detected: {detected}")
-        logger.info(f"Confidence: {confidence:.3f}")
+        logger.info("=== DIAGNOSTIC ANALYSIS - Iteration %d ===", iteration)
+        logger.info("Video: %s", video_identifier)
+        logger.info("Detected: %s", detected)
+        logger.info("Confidence: %.3f", confidence)
 
         # Log behavioral patterns identified
         observed_behavior = detailed_analysis.get('observed_behavior', '')
         reasoning = detailed_analysis.get('reasoning', '')
 
         if observed_behavior:
-            logger.info(f"MODEL OBSERVATIONS: {observed_behavior}")
+            logger.info("MODEL OBSERVATIONS: %s", observed_behavior)
 
         if reasoning:
-            logger.info(f"REASONING: {reasoning}")
+            logger.info("REASONING: %s", reasoning)
 
         # ENHANCED PATTERN ANALYSIS
         if observed_behavior or reasoning:
             self._analyze_behavioral_patterns(observed_behavior, reasoning, logger)
 
-        logger.info(f"=== END ENHANCED DIAGNOSTIC - Iteration {iteration} ===")
+        logger.info("=== END ENHANCED DIAGNOSTIC - Iteration %d ===", iteration)
 
     def _analyze_behavioral_patterns(self, observed_behavior: str, reasoning: str, logger: logging.Logger):
         """
@@ -267,13 +437,13 @@ class UnifiedShopliftingModel(GenerativeModel):
         combined_text = f"{observed_behavior} {reasoning}".lower()
 
         # Check for theft behavior indicators
-        found_theft_indicators = [ind for ind in self.THEFT_INDICATORS if ind in combined_text]
-        found_normal_indicators = [ind for ind in self.NORMAL_INDICATORS if ind in combined_text]
+        found_theft_indicators = self.THEFT_INDICATOR_MATCHER.find_all(combined_text)
+        found_normal_indicators = self.NORMAL_INDICATOR_MATCHER.find_all(combined_text)
 
         if found_theft_indicators:
-            logger.info(f"THEFT INDICATORS DETECTED: {found_theft_indicators}")
+            logger.info("THEFT INDICATORS DETECTED: %s", found_theft_indicators)
         if found_normal_indicators:
-            logger.info(f"NORMAL INDICATORS DETECTED: {found_normal_indicators}")
+            logger.info("NORMAL INDICATORS DETECTED: %s", found_normal_indicators)
 
     def _make_unified_final_decision(self, all_confidences: List[float], all_detections: List[bool],
                                      detection_threshold: float, logger: logging.Logger) -> Tuple[float, bool, str]:
@@ -309,14 +479,16 @@ class UnifiedShopliftingModel(GenerativeModel):
         """
         Simple decision logic for unified model based on iteration statistics.
         """
-        # Calculate confidence statistics
-        avg_confidence = np.mean(confidences)
-        max_confidence = np.max(confidences)
+        # Calculate confidence statistics - there is one value per iteration, so plain Python reductions
+        # are cheaper than converting the lists to numpy arrays
+        max_confidence = max(confidences)
         detection_count = sum(detections)
         total_iterations = len(detections)
 
-        logger.info(f"UNIFIED DECISION inputs: avg_conf={avg_confidence:.3f}, max_conf={max_confidence:.3f}, "
-                    f"detections={detection_count}/{total_iterations}")
+        # The average only feeds the log
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("UNIFIED DECISION inputs: avg_conf=%.3f, max_conf=%.3f, detections=%d/%d",
+                        sum(confidences) / len(confidences), max_confidence, detection_count, total_iterations)
 
         # Simple logic: Use the maximum confidence and trust the model's decisions
         final_confidence = max_confidence
@@ -333,8 +505,8 @@ class UnifiedShopliftingModel(GenerativeModel):
             reasoning = (f"PARTIAL DETECTION: Detected in {detection_count}/{total_iterations} iterations (max "
                          f"confidence: {max_confidence:.3f})")
 
-        logger.info(f"UNIFIED DECISION: conf={final_confidence:.3f}, detected={final_detection}")
-        logger.info(f"Reasoning: {reasoning}")
+        logger.info("UNIFIED DECISION: conf=%.3f, detected=%s", final_confidence, final_detection)
+        logger.info("Reasoning: %s", reasoning)
 
         return final_confidence, final_detection, reasoning
 
@@ -392,12 +564,16 @@ class UnifiedShopliftingModel(GenerativeModel):
             all_detections (List[bool]): All detection results
             logger (logging.Logger): Logger instance
         """
-        logger.info(f"UNIFIED DECISION ANALYSIS for {video_identifier}:")
-        logger.info(f"  All confidences: {all_confidences}")
-        logger.info(f"  All detections: {all_detections}")
-        logger.info(f"  Average confidence: {np.mean(all_confidences):.3f}")
-        logger.info(f"  Max confidence: {np.max(all_confidences):.3f}")
-        logger.info(f"  Detection count: {sum(all_detections)}/{len(all_detections)}")
+        # The statistics below are only computed when they will actually be logged
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
+        logger.info("UNIFIED DECISION ANALYSIS for %s:", video_identifier)
+        logger.info("  All confidences: %s", all_confidences)
+        logger.info("  All detections: %s", all_detections)
+        logger.info("  Average confidence: %.3f", sum(all_confidences) / len(all_confidences))
+        logger.info("  Max confidence: %.3f", max(all_confidences))
+        logger.info("  Detection count: %d/%d", sum(all_detections), len(all_detections))
 
     def _log_final_decision(self, final_confidence: float, final_detection: bool,
                             decision_reasoning: str, logger: logging.Logger):
@@ -410,10 +586,10 @@ class UnifiedShopliftingModel(GenerativeModel):
             decision_reasoning (str): Decision reasoning text
             logger (logging.Logger): Logger instance
         """
-        logger.info(f"UNIFIED ANALYSIS COMPLETE:")
-        logger.info(f"  Final Confidence: {final_confidence:.3f}")
-        logger.info(f"  Final Detection: {final_detection}")
-        logger.info(f"  Reasoning: {decision_reasoning}")
+        logger.info("UNIFIED ANALYSIS COMPLETE:")
+        logger.info("  Final Confidence: %.3f", final_confidence)
+        logger.info("  Final Detection: %s", final_detection)
+        logger.info("  Reasoning: %s", decision_reasoning)
 
     def _save_analysis_to_pickle(self, analysis: Dict, logger: logging.Logger) -> None:
         """
@@ -424,11 +600,11 @@ class UnifiedShopliftingModel(GenerativeModel):
             logger (logging.Logger): Logger instance
         """
         try:
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            # Microseconds keep file names unique when several videos are analyzed concurrently
+            current_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
             pkl_path = f"{UNIFIED_MODEL}_analysis_{current_time}.pkl"
 
-            with open(pkl_path, 'wb') as file:
-                pickle.dump(analysis, file)
+            write_bytes_atomic(pkl_path, pickle.dumps(analysis))
 
             logger.info(f"Analysis saved to pickle file: {pkl_path}")
 
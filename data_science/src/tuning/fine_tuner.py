@@ -2,10 +2,12 @@ import utils.env_utils as env_utils
 from typing import Tuple, Dict, Literal
 import os
 import json
-from google_client.google_client import GoogleClient
+from google_client.google_client import get_shared_google_client
 env_utils.load_env_variables()
 import pickle
 import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import pandas as pd
 from data_science.src.model.agentic.prompt_and_scheme.analysis_prompt import enhanced_prompt
@@ -15,15 +17,14 @@ from data_science.src.model.agentic.computer_vision_model import ComputerVisionM
 from data_science.src.model.pipeline.pipeline_manager import PipelineManager
 from data_science.src.utils import AGENTIC_MODEL
 from utils.logger_utils import create_logger
+from utils.json_utils import dumps_json_bytes
 from data_science.src.model.pipeline.shoplifting_analyzer import ShopliftingAnalyzer
-from google_client.google_client import GoogleClient
 
 class FineTuner:
-    google_client = GoogleClient(
-        project=os.getenv("GOOGLE_PROJECT_ID"),
-        location=os.getenv("GOOGLE_PROJECT_LOCATION"),
-        service_account_json_path=os.getenv("SERVICE_ACCOUNT_FILE")
-    )
+    google_client = get_shared_google_client()
+
+    # Formats of extracted frame images
+    FRAME_MIME_TYPES = {"png": "image/png", "jpg": "image/jpeg"}
 
     @staticmethod
     def make_images_dataset_for_analysis_model(frames_bucket: str,
@@ -32,7 +33,8 @@ class FineTuner:
                                                         path_prefix_inside_bucket: str = None,
                                                         pickles_folder: str = None,
                                                         csv_path: str = None,
-                                                        validation_percentage: float = 0.0) -> None:
+                                                        validation_percentage: float = 0.0,
+                                                        frame_format: Literal["png", "jpg"] = "png") -> None:
         """
         Creates a training dataset in JSONL format for Google's analysis model from either pickle files or CSV.
         Exactly one of pickles_folder or csv_path must be provided.
@@ -57,10 +59,15 @@ class FineTuner:
             pickles_folder (str, optional): Path to the folder containing analysis pickle files.
             csv_path (str, optional): Path to the CSV file containing analysis responses.
             validation_percentage (float, optional): Percentage of data to use for validation (0.0 to 1.0). Defaults to 0.0 (no validation split).
+            frame_format (Literal["png", "jpg"], optional): Format of the frame images in the bucket, as written
+                by extract_frames (jpg when extracted with a jpeg_quality). Defaults to "png".
 
         Raises:
             ValueError: If neither or both of pickles_folder and csv_path are provided.
         """
+        if frame_format not in FineTuner.FRAME_MIME_TYPES:
+            raise ValueError(f"frame_format must be one of {list(FineTuner.FRAME_MIME_TYPES)}")
+
         # Set default output path if none provided
         if output_jsonl_path is None:
             current_date = datetime.now().strftime("%m_%d_%H_%M_%S")
@@ -73,17 +80,23 @@ class FineTuner:
             print("Warning: No results found to process")
             return
 
-        with open(output_jsonl_path, "a") as f:
+        mime_type = FineTuner.FRAME_MIME_TYPES[frame_format]
+        frame_suffix = f".{frame_format}"
+
+        with open(output_jsonl_path, "a", encoding="utf-8") as f:
             for video_identifier, analysis_response in results.items():
                 video_name = FineTuner.get_video_name_without_extension(video_identifier)
                 path_inside_bucket = f"{path_prefix_inside_bucket}/{video_name}" if path_prefix_inside_bucket is not None else video_name
                 num_frames = FineTuner.google_client.num_of_files_in_bucket_path(frames_bucket, path_inside_bucket)
+
+                # The URI prefix and the model output are the same for every frame of the video
+                frame_uri_prefix = f"gs://{frames_bucket}/{path_inside_bucket}/"
+                output_text = analysis_response.replace('\n', '')
                 for i in range(num_frames):
-                    # Construct file URI for the frame
-                    file_uri = f"gs://{frames_bucket}/{path_inside_bucket}/{i}.png"
-                    data_row = FineTuner._construct_image_data_row(file_uri=file_uri,
+                    data_row = FineTuner._construct_image_data_row(file_uri=frame_uri_prefix + str(i) + frame_suffix,
                                                                    input_prompt=input_prompt,
-                                                                   output_text=analysis_response.replace('\n', ''))
+                                                                   output_text=output_text,
+                                                                   mime_type=mime_type)
                     f.write(data_row)
 
         print(f"Successfully created dataset with {len(results)} analysis responses in JSONL file: {output_jsonl_path}")
@@ -133,7 +146,7 @@ class FineTuner:
             print("Warning: No results found to process")
             return
 
-        with open(output_jsonl_path, "a") as f:
+        with open(output_jsonl_path, "a", encoding="utf-8") as f:
             for video_identifier, analysis_response in results.items():
                 # For videos, use the video_identifier directly as the file_uri
                 file_uri = video_identifier
@@ -171,7 +184,7 @@ class FineTuner:
             return
 
         # Read all lines from the input file
-        with open(jsonl_path, 'r') as f:
+        with open(jsonl_path, 'r', encoding="utf-8") as f:
             lines = f.readlines()
 
         if not lines:
@@ -195,11 +208,11 @@ class FineTuner:
         validation_path = os.path.join(directory, f"{name}_validation{ext}")
 
         # Write training data
-        with open(training_path, 'w') as f:
+        with open(training_path, 'w', encoding="utf-8") as f:
             f.writelines(training_lines)
 
         # Write validation data
-        with open(validation_path, 'w') as f:
+        with open(validation_path, 'w', encoding="utf-8") as f:
             f.writelines(validation_lines)
 
         print(f"Successfully split dataset:")
@@ -264,11 +277,12 @@ class FineTuner:
             Dict: Dict containing video identifier and analysis response.
         """
         results = dict()
-        for filename in os.listdir(folder_path):
-            if filename.endswith('.pkl'):
-                full_path = os.path.join(folder_path, filename)
-                video_identifier, analysis_response = FineTuner.extract_analysis_response_from_pickle(full_path)
-                results[video_identifier] = analysis_response
+        with os.scandir(folder_path) as entries:
+            pickle_paths = [entry.path for entry in entries if entry.name.endswith('.pkl') and entry.is_file()]
+
+        for pickle_path in pickle_paths:
+            video_identifier, analysis_response = FineTuner.extract_analysis_response_from_pickle(pickle_path)
+            results[video_identifier] = analysis_response
 
         # Export to CSV if requested
         if export_csv:
@@ -379,7 +393,8 @@ class FineTuner:
             return {}
 
     @staticmethod
-    def _construct_image_data_row(file_uri: str, input_prompt: str, output_text: str) -> str:
+    def _construct_image_data_row(file_uri: str, input_prompt: str, output_text: str,
+                                  mime_type: str = "image/png") -> str:
         """
         Constructs a single row for the JSONL training dataset in Google's required format.
 
@@ -387,6 +402,7 @@ class FineTuner:
             file_uri (str): Google Cloud Storage URI for the image frame
             input_prompt (str): Input prompt text for the model
             output_text (str): Expected output/analysis response
+            mime_type (str, optional): MIME type of the image frame. Defaults to "image/png".
 
         Returns:
             str: JSONL row string with user and model roles
@@ -398,7 +414,7 @@ class FineTuner:
                     "parts": [
                         {
                             "fileData": {
-                                "mimeType": "image/png",
+                                "mimeType": mime_type,
                                 "fileUri": file_uri
                             }
                         },
@@ -417,7 +433,7 @@ class FineTuner:
                 }
             ]
         }
-        data_row = json.dumps(row) + "\n"
+        data_row = dumps_json_bytes(row).decode("utf-8") + "\n"
         return data_row
 
     @staticmethod
@@ -469,7 +485,7 @@ class FineTuner:
             ],
             "generationConfig": {"mediaResolution": f"MEDIA_RESOLUTION_{media_resolution_level}"}
         }
-        data_row = json.dumps(row) + "\n"
+        data_row = dumps_json_bytes(row).decode("utf-8") + "\n"
         return data_row
 
     @staticmethod
@@ -477,37 +493,87 @@ class FineTuner:
             every_n_frames: int,
             input_folder_path: str,
             output_folder_path: str,
+            max_workers: int = None,
+            max_side: int = None,
+            num_frames: int = None,
+            jpeg_quality: int = None,
+            min_frame_difference: int = None,
     ) -> None:
         """
         Extracts frames from all mp4 and avi videos in the input folder.
 
+        Videos are decoded in parallel worker processes, one video per worker, since frame
+        decoding and image encoding are CPU-bound and independent between videos.
+
         Args:
             every_n_frames (int): Number of frames to skip between extractions.
             input_folder_path (str): Path to the folder containing videos.
             output_folder_path (str): Path to the folder where frames will be saved.
+            max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            max_side (int, optional): Downscale frames so their longest side is at most this many pixels.
+                Defaults to None (keep the original resolution).
+            num_frames (int, optional): Extract this many evenly spaced frames per video instead of every
+                n-th frame. Defaults to None (use every_n_frames).
+            jpeg_quality (int, optional): Save frames as JPEG with this quality (0-100) instead of PNG.
+                Defaults to None (lossless PNG).
+            min_frame_difference (int, optional): Skip frames nearly identical to the previously saved frame
+                (see extract_frames). Defaults to None (keep every sampled frame).
         """
-        # Get all .mp4 and .avi files in the input folder
-        video_files = [
-            f for f in os.listdir(input_folder_path)
-            if f.lower().endswith(('.mp4', '.avi'))
-        ]
+        max_workers = max_workers or os.cpu_count() or 1
+        print(f"Extracting frames using up to {max_workers} worker processes")
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Videos are submitted while the folder is still being scanned, so extraction of the first
+            # videos starts right away instead of waiting for the full listing
+            futures = [
+                executor.submit(FineTuner.extract_frames, every_n_frames, video_path,
+                                os.path.join(output_folder_path, video_name), max_side, num_frames, jpeg_quality,
+                                min_frame_difference)
+                for video_path, video_name in FineTuner._iter_video_files(input_folder_path)
+            ]
 
-        if not video_files:
-            print("No video files found in the input folder.")
-            return
+            if not futures:
+                print("No video files found in the input folder.")
+                return
 
-        for video_file in video_files:
-            video_name, _ = os.path.splitext(video_file)
-            video_path = os.path.join(input_folder_path, video_file)
-            output_subfolder = os.path.join(output_folder_path, video_name)
+            # Raise errors of the worker processes
+            for future in futures:
+                future.result()
 
-            print(f"Extracting frames from: {video_file}")
-            FineTuner.extract_frames(every_n_frames, video_path, output_subfolder)
+    @staticmethod
+    def _iter_video_files(folder_path: str):
+        """
+        Lazily yield the mp4 and avi videos in a folder.
+
+        Args:
+            folder_path (str): Path to the folder containing videos.
+
+        Yields:
+            Tuple[str, str]: (video_path, video_name_without_extension)
+        """
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(('.mp4', '.avi')) and entry.is_file():
+                    yield entry.path, os.path.splitext(entry.name)[0]
 
     @staticmethod
-    def extract_frames(every_n_frames: int, video_path: str, output_folder: str) -> None:
+    def extract_frames(every_n_frames: int, video_path: str, output_folder: str, max_side: int = None,
+                       num_frames: int = None, jpeg_quality: int = None, min_frame_difference: int = None) -> None:
         """
         Legacy method for local file extraction. Kept for backwards compatibility.
+
+        Args:
+            every_n_frames (int): Number of frames to skip between extractions.
+            video_path (str): Path to the video file.
+            output_folder (str): Path to the folder where frames will be saved.
+            max_side (int, optional): Downscale frames so their longest side is at most this many pixels.
+                Defaults to None (keep the original resolution).
+            num_frames (int, optional): Extract this many frames evenly spaced over the whole video.
+                Defaults to None (use every_n_frames).
+            jpeg_quality (int, optional): Save frames as JPEG with this quality (0-100) instead of PNG.
+                Defaults to None (lossless PNG).
+            min_frame_difference (int, optional): Skip sampled frames whose difference hash (see _dhash) is within
+                this many bits (0-64) of the previously saved frame. Defaults to None (keep every sampled frame).
         """
         os.makedirs(output_folder, exist_ok=True)
 
@@ -516,23 +582,92 @@ class FineTuner:
             print(f"Cannot open video file: {video_path}")
             return
 
+        sampled_frame_indices = None
+        if num_frames:
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if frame_count > 0:
+                sampled_frame_indices = frozenset(
+                    np.linspace(0, frame_count - 1, num=min(num_frames, frame_count), dtype=np.int64).tolist()
+                )
+
+        if jpeg_quality is None:
+            frame_extension, encode_params = "png", []
+        else:
+            frame_extension, encode_params = "jpg", [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+
         frame_idx = 0
         saved_frame_idx = 0
-        success, frame = cap.read()
-
-        while success:
-            if frame_idx % every_n_frames == 0:
-                frame_filename = f"{saved_frame_idx}.png"
+        last_saved_hash = None
+
+        # grab() only advances the stream; the frame is decoded into an image (retrieve) just for
+        # the sampled frames, instead of materializing every frame of the video with read()
+        while cap.grab():
+            if (frame_idx in sampled_frame_indices if sampled_frame_indices is not None
+                    else frame_idx % every_n_frames == 0):
+                success, frame = cap.retrieve()
+                if not success:
+                    break
+
+                if min_frame_difference is not None:
+                    frame_hash = FineTuner._dhash(frame)
+                    if (last_saved_hash is not None
+                            and bin(frame_hash ^ last_saved_hash).count("1") <= min_frame_difference):
+                        frame_idx += 1
+                        continue
+                    last_saved_hash = frame_hash
+
+                frame_filename = f"{saved_frame_idx}.{frame_extension}"
                 frame_path = os.path.join(output_folder, frame_filename)
-                cv2.imwrite(frame_path, frame)
+                cv2.imwrite(frame_path, FineTuner._downscale_frame(frame, max_side), encode_params)
                 saved_frame_idx += 1
 
             frame_idx += 1
-            success, frame = cap.read()
 
         cap.release()
         print(f"Frames extracted for video: {video_path}")
 
+    @staticmethod
+    def _dhash(frame) -> int:
+        """
+        Compute the 64-bit difference hash of a frame.
+
+        The frame is shrunk to 9x8 grayscale pixels and every bit records whether a pixel is brighter than
+        its right neighbour, so near-identical frames get hashes that differ in only a few bits.
+
+        Args:
+            frame: Frame image array as returned by OpenCV (BGR).
+
+        Returns:
+            int: The difference hash
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+        return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), "big")
+
+    @staticmethod
+    def _downscale_frame(frame, max_side: int = None):
+        """
+        Shrink a frame so its longest side is at most max_side pixels, keeping the aspect ratio.
+
+        Args:
+            frame: Frame image array as returned by OpenCV.
+            max_side (int, optional): Maximum length of the longest side. None disables downscaling.
+
+        Returns:
+            The resized frame, or the original frame if it is already small enough.
+        """
+        if not max_side:
+            return frame
+
+        height, width = frame.shape[:2]
+        longest_side = max(height, width)
+        if longest_side <= max_side:
+            return frame
+
+        scale = max_side / longest_side
+        # INTER_AREA gives the best quality when shrinking images
+        return cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+
     @staticmethod
     def load_pickle_object(pickle_path: str):
         """
@@ -596,11 +731,7 @@ class FineTuner:
     @staticmethod
     def make_self_training_data():
         logger = create_logger('FineTuner', 'fine_tuner_self_training.log')
-        google_client = GoogleClient(
-            project=os.getenv("GOOGLE_PROJECT_ID"),
-            location=os.getenv("GOOGLE_PROJECT_LOCATION"),
-            service_account_json_path=os.getenv("SERVICE_ACCOUNT_FILE")
-         )
+        google_client = get_shared_google_client()
         cv_model = ComputerVisionModel()
         analysis_model = AnalysisModel(model_name="gemini-2.5-flash")
 
@@ -4,6 +4,7 @@ Summary generation utilities for event descriptions.
 This module contains functions for generating ultra-short summaries from 
 video analysis results, using behavioral indicators and analysis data.
 """
+import re
 from typing import List, Dict
 from data_science.src.model.pipeline.shoplifting_analyzer import ShopliftingAnalyzer
 from utils.logger_utils import create_logger
@@ -12,6 +13,15 @@ import nltk
 # Create logger for summary generation
 logger = create_logger("SummaryGenerator", "summary_generator.log")
 
+# Confidence phrases in the decision reasoning, each matched with a single regex scan of the lowercased text
+HIGH_CONFIDENCE_PATTERN = re.compile("high confidence|strong evidence|clear indication|definitive")
+MEDIUM_CONFIDENCE_PATTERN = re.compile("likely|probable|suggests|indicates")
+
+# Theft indicators grouped by the key behavior they point to
+CONCEALMENT_INDICATORS = frozenset({'concealed', 'hidden', 'tucked', 'conceal', 'pocket'})
+NERVOUS_INDICATORS = frozenset({'nervous', 'furtive', 'suspicious'})
+MOVEMENT_INDICATORS = frozenset({'quick', 'hand movement'})
+
 
 def generate_event_description_summary(iteration_results: List[dict], decision_reasoning: str) -> str:
     """
@@ -102,7 +112,7 @@ def create_short_summary(full_text: str, decision_reasoning: str, iteration_resu
         str: Ultra-short 6-word summary
     """
     # Extract key information
-    detected = any('detected' in str(decision_reasoning).lower() for _ in [1])
+    detected = 'detected' in str(decision_reasoning).lower()
     confidence_level = extract_confidence_level(decision_reasoning, iteration_results)
     behavior_type = extract_key_behavior(full_text, iteration_results)
     
@@ -128,8 +138,7 @@ def extract_confidence_level(decision_reasoning: str, iteration_results: List[di
     text = (decision_reasoning or '').lower()
     
     # Check for high confidence indicators
-    high_indicators = ['high confidence', 'strong evidence', 'clear indication', 'definitive']
-    if any(indicator in text for indicator in high_indicators):
+    if HIGH_CONFIDENCE_PATTERN.search(text):
         return 'high'
     
     # Check evidence tier from iterations
@@ -142,8 +151,7 @@ def extract_confidence_level(decision_reasoning: str, iteration_results: List[di
                 return 'medium'
     
     # Check for medium confidence indicators
-    medium_indicators = ['likely', 'probable', 'suggests', 'indicates']
-    if any(indicator in text for indicator in medium_indicators):
+    if MEDIUM_CONFIDENCE_PATTERN.search(text):
         return 'medium'
     
     return 'low'
@@ -170,25 +178,20 @@ def extract_key_behavior(full_text: str, iteration_results: List[dict]) -> str:
                     elif 'nervous' in first_behavior or 'anxious' in first_behavior:
                         return 'nervous'
     
-    # Use ShopliftingAnalyzer theft indicators for analysis
-    theft_indicators = ShopliftingAnalyzer.THEFT_INDICATORS
-    normal_indicators = ShopliftingAnalyzer.NORMAL_INDICATORS
-    
-    # Count matches for theft vs normal indicators
-    theft_matches = sum(1 for indicator in theft_indicators if indicator.lower() in text)
-    normal_matches = sum(1 for indicator in normal_indicators if indicator.lower() in text)
+    # Find theft vs normal indicators of ShopliftingAnalyzer (the indicators are lowercase, like the text)
+    theft_indicators = ShopliftingAnalyzer.THEFT_INDICATOR_MATCHER.find_all(text)
+    normal_matches = ShopliftingAnalyzer.NORMAL_INDICATOR_MATCHER.count(text)
     
     # Determine behavior type based on strongest matches
-    if theft_matches > normal_matches:
+    if len(theft_indicators) > normal_matches:
         # Find the most specific theft behavior
         for indicator in theft_indicators:
-            if indicator.lower() in text:
-                if indicator.lower() in ['concealed', 'hidden', 'tucked', 'conceal', 'pocket']:
-                    return 'concealment'
-                elif indicator.lower() in ['nervous', 'furtive', 'suspicious']:
-                    return 'nervous'
-                elif indicator.lower() in ['quick', 'hand movement']:
-                    return 'movement'
+            if indicator in CONCEALMENT_INDICATORS:
+                return 'concealment'
+            elif indicator in NERVOUS_INDICATORS:
+                return 'nervous'
+            elif indicator in MOVEMENT_INDICATORS:
+                return 'movement'
         return 'suspicious'
     else:
         return 'activity'
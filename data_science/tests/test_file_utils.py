@@ -0,0 +1,45 @@
+import json
+import os
+
+import pytest
+
+from utils import write_bytes_atomic, write_json_atomic
+
+
+def test_write_bytes_atomic_creates_and_replaces_file(tmp_path):
+    path = tmp_path / "result.bin"
+
+    write_bytes_atomic(str(path), b"first")
+    write_bytes_atomic(str(path), b"second")
+
+    assert path.read_bytes() == b"second"
+    assert os.listdir(tmp_path) == ["result.bin"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = tmp_path / "result.bin"
+    write_bytes_atomic(str(path), b"previous")
+
+    with pytest.raises(TypeError):
+        write_bytes_atomic(str(path), "not bytes")
+
+    # The previous content is intact and no temporary file is left behind
+    assert path.read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["result.bin"]
+
+
+def test_write_json_atomic_round_trips(tmp_path):
+    path = tmp_path / "result.json"
+    result = {"fingerprint": "abc", "result": {"final_detection": True, "confidence_levels": [0.5, 0.75]}}
+
+    write_json_atomic(str(path), result)
+
+    assert json.loads(path.read_text(encoding="utf-8")) == result
+
+
+def test_write_json_atomic_uses_default_for_unknown_types(tmp_path):
+    path = tmp_path / "result.json"
+
+    write_json_atomic(str(path), {"values": {1, 2}}, default=sorted)
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"values": [1, 2]}
@@ -0,0 +1,60 @@
+import random
+
+from utils import KeywordMatcher
+
+INDICATORS = ['pocket', 'bag', 'conceal', 'concealed', 'concealment', 'hand movement', 'quick', 'suspicious']
+
+
+def expected_keywords(keywords, text):
+    return [keyword for keyword in dict.fromkeys(keywords) if keyword and keyword in text]
+
+
+def test_finds_keywords_in_original_order():
+    matcher = KeywordMatcher(INDICATORS)
+    text = "a quick hand movement near the pocket"
+
+    assert matcher.find_all(text) == ['pocket', 'hand movement', 'quick']
+    assert matcher.count(text) == 3
+
+
+def test_contained_keywords_are_all_found():
+    matcher = KeywordMatcher(INDICATORS)
+
+    assert matcher.find_all("signs of concealment") == ['conceal', 'concealment']
+    assert matcher.find_all("concealed item") == ['conceal', 'concealed']
+
+
+def test_overlapping_keywords_are_all_found():
+    matcher = KeywordMatcher(['abc', 'bcd', 'cd'])
+
+    assert matcher.find_all("xabcdx") == ['abc', 'bcd', 'cd']
+
+
+def test_matching_is_case_sensitive_like_in():
+    assert KeywordMatcher(INDICATORS).find_all("POCKET Bag") == []
+
+
+def test_no_keywords_and_no_matches():
+    assert KeywordMatcher([]).find_all("anything") == []
+    assert KeywordMatcher(['', 'pocket']).count("") == 0
+    assert KeywordMatcher(INDICATORS).find_all("browsing the shelf") == []
+
+
+def test_duplicate_keywords_are_reported_once():
+    matcher = KeywordMatcher(['bag', 'pocket', 'bag'])
+
+    assert matcher.find_all("bag in pocket, another bag") == ['bag', 'pocket']
+    assert matcher.count("bag in pocket, another bag") == 2
+
+
+def test_matches_substring_checks_on_random_texts():
+    rng = random.Random(0)
+    alphabet = "abc "
+
+    for _ in range(2000):
+        keywords = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(0, 6))]
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+        matcher = KeywordMatcher(keywords)
+
+        assert matcher.find_all(text) == expected_keywords(keywords, text)
+        assert matcher.count(text) == len(expected_keywords(keywords, text))
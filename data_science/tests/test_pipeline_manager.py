@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+
+from data_science.src.model.pipeline.pipeline_manager import PipelineManager
+
+VIDEO_URI = "gs://bucket/videos/video_1.mp4"
+
+
+def unified_analyzer(model_name="gemini-2.5-flash", threshold=0.45, early_stop_iterations=None):
+    """Build an object with the analyzer attributes the results cache fingerprint reads"""
+    model = SimpleNamespace(_model_name=model_name, _system_instruction=["instruction"], _generation_config=None)
+    return SimpleNamespace(unified_model=model, shoplifting_detection_threshold=threshold,
+                           early_stop_iterations=early_stop_iterations)
+
+
+def fingerprint(analyzer, video_uri=VIDEO_URI, video_version="md5:abc", iterations=3, strategy_name="UNIFIED"):
+    return PipelineManager._get_analysis_fingerprint(analyzer, video_uri, video_version, iterations, strategy_name)
+
+
+def batch_row(video_uri=VIDEO_URI, texts=("{}",), status=None, response=True) -> dict:
+    """Build a batch prediction output row like the ones Vertex AI writes"""
+    request = {"contents": [{"role": "user", "parts": [
+        {"fileData": {"fileUri": video_uri, "mimeType": "video/mp4"}, "text": None},
+        {"fileData": None, "text": "prompt"}
+    ]}]}
+    row = {"request": request, "status": status}
+    if response:
+        row["response"] = {"candidates": [{"content": {"parts": [{"text": text}]}} for text in texts]}
+    else:
+        row["response"] = None
+    return row
+
+
+def output_file(*rows) -> bytes:
+    return b"\n".join(json.dumps(row).encode("utf-8") for row in rows) + b"\n"
+
+
+def test_batch_responses_grouped_by_video():
+    other_uri = "gs://bucket/videos/video_2.mp4"
+    responses, failed_rows = PipelineManager._collect_unified_batch_responses([
+        output_file(batch_row(texts=("a", "b"))),
+        output_file(batch_row(video_uri=other_uri, texts=("c",)), batch_row(texts=("d",)))
+    ])
+
+    assert failed_rows == 0
+    assert responses == {VIDEO_URI: ["a", "b", "d"], other_uri: ["c"]}
+
+
+def test_batch_failed_rows_are_skipped():
+    responses, failed_rows = PipelineManager._collect_unified_batch_responses([output_file(
+        batch_row(status="RESOURCE_EXHAUSTED", response=False),
+        batch_row(response=False),
+        batch_row(texts=()),
+        batch_row(texts=("ok",))
+    )])
+
+    assert failed_rows == 3
+    assert responses == {VIDEO_URI: ["ok"]}
+
+
+def test_batch_request_video_uri_skips_null_file_data():
+    request = {"contents": [{"parts": [{"fileData": None, "text": "prompt"},
+                                       {"fileData": {"fileUri": VIDEO_URI}}]}]}
+
+    assert PipelineManager._get_batch_request_video_uri(request) == VIDEO_URI
+    assert PipelineManager._get_batch_request_video_uri({"contents": None}) is None
+
+
+def test_fingerprint_is_stable_for_unchanged_inputs():
+    assert fingerprint(unified_analyzer()) == fingerprint(unified_analyzer())
+
+
+def test_fingerprint_identifies_videos_with_content_hash_by_content():
+    assert fingerprint(unified_analyzer(), video_uri="gs://bucket/a.mp4") == \
+           fingerprint(unified_analyzer(), video_uri="gs://bucket/copy_of_a.mp4")
+    assert fingerprint(unified_analyzer(), video_version="generation:1") != \
+           fingerprint(unified_analyzer(), video_uri="gs://bucket/other.mp4", video_version="generation:1")
+
+
+def test_fingerprint_changes_with_analysis_inputs():
+    base = fingerprint(unified_analyzer())
+
+    assert fingerprint(unified_analyzer(), video_version="md5:def") != base
+    assert fingerprint(unified_analyzer(), iterations=5) != base
+    assert fingerprint(unified_analyzer(), strategy_name="AGENTIC") != base
+    assert fingerprint(unified_analyzer(threshold=0.7)) != base
+    assert fingerprint(unified_analyzer(early_stop_iterations=2)) != base
+    assert fingerprint(unified_analyzer(model_name="projects/p/locations/l/endpoints/1")) != base
+
+
+def test_failed_analyses_are_not_cached():
+    successful = {"final_detection": True, "iteration_results": [{"detailed_analysis": {"evidence_tier": "TIER_1_HIGH"}}]}
+
+    assert PipelineManager._is_successful_analysis(successful)
+    assert not PipelineManager._is_successful_analysis({"error": "Analysis failed"})
+    assert not PipelineManager._is_successful_analysis(
+        {"iteration_results": [{"detailed_analysis": {"error": "Response parsing failed"}}]})
+    assert not PipelineManager._is_successful_analysis(
+        {"iteration_results": [{"detailed_analysis": {"evidence_tier": "ERROR"}}]})
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+import utils.rate_limit_utils as rate_limit_utils
+from utils import RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock advanced only by sleeping"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(rate_limit_utils.time, "monotonic", fake_clock.monotonic)
+    monkeypatch.setattr(rate_limit_utils.time, "sleep", fake_clock.sleep)
+    return fake_clock
+
+
+def test_unlimited_by_default(clock):
+    limiter = RateLimiter()
+    for _ in range(10):
+        limiter.acquire()
+
+    assert clock.sleeps == []
+
+
+def test_calls_are_spaced_evenly(clock):
+    limiter = RateLimiter(max_calls_per_minute=120)
+    for _ in range(4):
+        limiter.acquire()
+
+    # The first call goes through immediately, the next ones wait for their slot
+    assert clock.sleeps == pytest.approx([0.5, 0.5, 0.5])
+    assert clock.now == pytest.approx(101.5)
+
+
+def test_idle_time_is_not_banked(clock):
+    limiter = RateLimiter(max_calls_per_minute=60)
+    limiter.acquire()
+    clock.now += 10
+    limiter.acquire()
+    limiter.acquire()
+
+    assert clock.sleeps == pytest.approx([1.0])
+
+
+def test_set_rate_disables_limiting(clock):
+    limiter = RateLimiter(max_calls_per_minute=60)
+    limiter.set_rate(0)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert clock.sleeps == []
+
+
+def test_concurrent_callers_reserve_distinct_slots(clock, monkeypatch):
+    # Time stands still, so every waiting caller sleeps until its own reserved slot
+    sleeps = []
+    monkeypatch.setattr(rate_limit_utils.time, "sleep", sleeps.append)
+    limiter = RateLimiter(max_calls_per_minute=60)
+
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(sleeps) == pytest.approx([1.0, 2.0, 3.0, 4.0])
@@ -0,0 +1,84 @@
+import pytest
+
+import utils.retry_utils as retry_utils
+from utils import call_with_retry
+
+
+class TransientError(Exception):
+    pass
+
+
+class CountingLimiter:
+    """Rate limiter recording how often it was acquired"""
+
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(retry_utils.time, "sleep", delays.append)
+    return delays
+
+
+def failing(times, error=TransientError, result="ok"):
+    """Build a function failing its first calls with the given error"""
+    calls = []
+
+    def func():
+        calls.append(None)
+        if len(calls) <= times:
+            raise error("failure")
+        return result
+
+    func.calls = calls
+    return func
+
+
+def test_returns_result_without_retrying():
+    func = failing(0)
+
+    assert call_with_retry(func, retry_on=(TransientError,), rate_limiter=None) == "ok"
+    assert len(func.calls) == 1
+
+
+def test_retries_transient_errors(no_sleep):
+    func = failing(2)
+    limiter = CountingLimiter()
+
+    assert call_with_retry(func, retry_on=(TransientError,), rate_limiter=limiter) == "ok"
+    assert len(func.calls) == 3
+    assert limiter.acquired == 3
+    assert len(no_sleep) == 2
+
+
+def test_raises_last_error_after_max_attempts():
+    func = failing(5)
+
+    with pytest.raises(TransientError):
+        call_with_retry(func, retry_on=(TransientError,), max_attempts=3, rate_limiter=None)
+    assert len(func.calls) == 3
+
+
+def test_does_not_retry_other_errors():
+    func = failing(1, error=ValueError)
+
+    with pytest.raises(ValueError):
+        call_with_retry(func, retry_on=(TransientError,), rate_limiter=None)
+    assert len(func.calls) == 1
+
+
+def test_backoff_is_bounded_by_exponential_delay(no_sleep):
+    func = failing(6)
+
+    with pytest.raises(TransientError):
+        call_with_retry(func, retry_on=(TransientError,), max_attempts=6, base_delay=1.0, max_delay=4.0,
+                        rate_limiter=None)
+
+    assert len(no_sleep) == 5
+    for attempt, delay in enumerate(no_sleep):
+        assert 0 <= delay <= min(4.0, 2 ** attempt)
@@ -3,10 +3,13 @@ from google.auth.transport.requests import Request
 from google.oauth2.service_account import Credentials
 from typing import List, Tuple
 from google.cloud import storage
+from google.cloud.storage.retry import DEFAULT_RETRY
 import tempfile
 import subprocess
 import os
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from utils.logger_utils import create_logger
 
@@ -16,6 +19,73 @@ try:
 except ImportError:
     FFMPEG_PATH = "ffmpeg"  # Fall back to system ffmpeg
 
+# Explicit (connect, read) timeouts for storage requests, so a stalled connection fails fast and is
+# retried instead of holding up a listing, download or upload for minutes
+GCS_REQUEST_TIMEOUT = (10, 120)
+
+# Uploads are not retried by default (they have no generation precondition). Every upload rewrites
+# the whole object, so retrying transient failures is safe and avoids failing on a single slow request.
+GCS_UPLOAD_RETRY = DEFAULT_RETRY.with_deadline(600)
+
+
+def build_ffmpeg_convert_command(input_path: str, output_path: str, max_height: int = None) -> List[str]:
+    """
+    Build the ffmpeg command converting a video to MP4.
+
+    Args:
+        input_path (str): Path of the video to convert
+        output_path (str): Path of the MP4 file to write
+        max_height (int, optional): Downscale videos taller than this many pixels. Defaults to None.
+
+    Returns:
+        List[str]: ffmpeg command line
+    """
+    command = [FFMPEG_PATH, "-i", input_path]
+    if max_height:
+        # -2 keeps the aspect ratio with an even width, as required by the H.264 encoder
+        command += ["-vf", f"scale=-2:'min(ih,{max_height})'"]
+    command.append(output_path)
+    return command
+
+
+@lru_cache(maxsize=8)
+def _load_service_account_credentials(service_account_json_path: str, mtime_ns: int) -> Credentials:
+    """
+    Load service account credentials, cached per key file version.
+
+    The modification time is part of the cache key, so clients created for the same unchanged key
+    file share one credentials object (and its access token) while a replaced key file is read again.
+
+    Args:
+        service_account_json_path (str): Path to the service account JSON file
+        mtime_ns (int): Key file modification time in nanoseconds (cache key only)
+
+    Returns:
+        Credentials: Service account credentials scoped to Google Cloud Platform
+    """
+    return Credentials.from_service_account_file(
+        service_account_json_path,
+        scopes=['https://www.googleapis.com/auth/cloud-platform'])
+
+
+@lru_cache(maxsize=None)
+def get_shared_google_client() -> "GoogleClient":
+    """
+    Get the process-wide GoogleClient configured from the environment, creating it on first use.
+
+    Every client loads the service account credentials, initializes Vertex AI and opens its own storage
+    HTTP connection pool, so services share this one instead of building a client each.
+
+    Returns:
+        GoogleClient: Client for GOOGLE_PROJECT_ID, GOOGLE_PROJECT_LOCATION and SERVICE_ACCOUNT_FILE
+    """
+    return GoogleClient(
+        project=os.getenv("GOOGLE_PROJECT_ID"),
+        location=os.getenv("GOOGLE_PROJECT_LOCATION"),
+        service_account_json_path=os.getenv("SERVICE_ACCOUNT_FILE")
+    )
+
+
 class GoogleClient:
     def __init__(self, project: str, location: str, service_account_json_path: str):
         """
@@ -37,9 +107,8 @@ class GoogleClient:
 
     def _get_credentials(self) -> Credentials:
         """Get Google Cloud credentials from service account file."""
-        credentials = Credentials.from_service_account_file(
-            self.service_account_json_path,
-            scopes=['https://www.googleapis.com/auth/cloud-platform'])
+        credentials = _load_service_account_credentials(self.service_account_json_path,
+                                                        os.stat(self.service_account_json_path).st_mtime_ns)
         if credentials.expired:
             credentials.refresh(Request())
         return credentials
@@ -58,15 +127,14 @@ class GoogleClient:
         Returns:
             Tuple[List[str], List[str]]: Lists of video URIs and names
         """
-        # Get the bucket object
-        bucket = self.storage_client.get_bucket(bucket_name)
-        
-        # List all objects in the bucket and filter by .mp4 extension
-        names_blobs = bucket.list_blobs()
-        uris_blobs = bucket.list_blobs()
+        # Reference the bucket without fetching its metadata - listing fails just the same if it doesn't exist
+        bucket = self.storage_client.bucket(bucket_name)
         
-        names = [blob.name for blob in names_blobs if blob.name.endswith('.mp4') or blob.name.endswith('.MP4')]
-        uris = [f"gs://{bucket_name}/{blob.name}" for blob in uris_blobs if blob.name.endswith('.mp4') or blob.name.endswith('.MP4')]
+        # List all objects in the bucket once (names only) and filter by .mp4 extension
+        blobs = bucket.list_blobs(fields="items(name),nextPageToken", timeout=GCS_REQUEST_TIMEOUT)
+
+        names = [blob.name for blob in blobs if blob.name.endswith('.mp4') or blob.name.endswith('.MP4')]
+        uris = [f"gs://{bucket_name}/{name}" for name in names]
 
         return uris, names
 
@@ -85,20 +153,21 @@ class GoogleClient:
                       that match the prefix, sorted by modification time (newest first).
                       Returns an empty list if no matches are found.
         """
-        matching_files = []
-        for filename in os.listdir(directory):
-            if filename.startswith(prefix):
-                file_path = os.path.join(directory, filename)
-                matching_files.append(file_path)
+        # A single scandir pass yields the names and the stat results together, so sorting by
+        # modification time does not need a separate stat call for every matching file
+        with os.scandir(directory) as entries:
+            matching_entries = [(entry.stat().st_mtime, entry.path) for entry in entries
+                                if entry.name.startswith(prefix) and entry.is_file()]
 
         # Sort by modification time, newest first
-        matching_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+        matching_entries.sort(reverse=True)
+        matching_files = [file_path for _, file_path in matching_entries]
 
         self.logger.info(f"Found {len(matching_files)} files matching '{prefix}': {[os.path.basename(f) for f in matching_files]}")
 
         return matching_files
 
-    def export_camera_recording_to_bucket(self, bucket_name: str, camera_name: str) -> str:
+    def export_camera_recording_to_bucket(self, bucket_name: str, camera_name: str, max_height: int = None) -> str:
         """
         Upload a camera recording file from local storage to a Google Cloud Storage bucket.
         If the video is not in MP4 format, it will be converted to MP4 before upload.
@@ -109,6 +178,8 @@ class GoogleClient:
             camera_name (str): Name/prefix of the camera used to identify the recording file.
                              This is used as a prefix to search for matching files in the
                              local videos directory.
+            max_height (int, optional): Downscale recordings that are converted to MP4 to at most this many
+                pixels high. Defaults to None (keep the original resolution).
         
         Returns:
             str: The Google Cloud Storage URI of the uploaded video file (gs://bucket/filename)
@@ -151,7 +222,7 @@ class GoogleClient:
                 try:
                     # Convert to MP4 using ffmpeg
                     result = subprocess.run(
-                        [FFMPEG_PATH, "-i", local_file_path, converted_file_path],
+                        build_ffmpeg_convert_command(local_file_path, converted_file_path, max_height),
                         check=True,
                         capture_output=True,
                         text=True
@@ -194,7 +265,7 @@ class GoogleClient:
 
             # Upload using the file path (original or converted)
             self.logger.info(f"Uploading file: {upload_file_path} as {blob_name}")
-            blob.upload_from_filename(upload_file_path)
+            blob.upload_from_filename(upload_file_path, timeout=GCS_REQUEST_TIMEOUT, retry=GCS_UPLOAD_RETRY)
             self.logger.info(f"Successfully uploaded to bucket: {blob_name}")
 
             # Create the GCS URI to return
@@ -216,42 +287,67 @@ class GoogleClient:
             self.logger.error(f"Upload failed for camera '{camera_name}': {e}")
             raise
 
-    def convert_all_videos_in_bucket_to_mp4(self, bucket_name: str, extensions: List[str] = None):
+    def convert_all_videos_in_bucket_to_mp4(self, bucket_name: str, extensions: List[str] = None,
+                                            max_height: int = None, max_workers: int = 4):
         """
         Convert all videos with specified extensions in the given bucket to MP4.
         The original video files will be replaced by their MP4 versions.
 
+        Videos are converted in parallel: each conversion mostly waits on the download, the ffmpeg
+        subprocess and the upload, none of which hold the GIL.
+
         Args:
             bucket_name: Name of the Google Cloud Storage bucket
             extensions: List of video file extensions to convert (default ["avi"])
+            max_height: Downscale converted videos to at most this many pixels high (default: keep resolution)
+            max_workers: Number of videos converted at the same time (default 4)
         """
-        extensions = extensions or ["avi"]
+        suffixes = tuple(ext.lower() for ext in (extensions or ["avi"]))
         bucket = self.storage_client.bucket(bucket_name)
-        blobs = bucket.list_blobs()
+        # Only the names are needed to download, replace and delete the videos
+        blobs = bucket.list_blobs(fields="items(name),nextPageToken", timeout=GCS_REQUEST_TIMEOUT)
 
-        for blob in blobs:
-            if any(blob.name.lower().endswith(ext.lower()) for ext in extensions):
-                print(f"Converting: {blob.name}")
-                with tempfile.TemporaryDirectory() as tmpdir:
-                    local_original_path = os.path.join(tmpdir, os.path.basename(blob.name))
-                    local_converted_path = os.path.join(tmpdir,
-                                                        os.path.splitext(os.path.basename(blob.name))[0] + ".mp4")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [executor.submit(self._convert_blob_to_mp4, bucket, blob, max_height)
+                       for blob in blobs if blob.name.lower().endswith(suffixes)]
 
-                    # Download original file
-                    blob.download_to_filename(local_original_path)
+            # Raise errors of the conversion threads
+            for future in futures:
+                future.result()
 
-                    # Convert to MP4 using ffmpeg
-                    subprocess.run([FFMPEG_PATH, "-i", local_original_path, local_converted_path], check=True)
+    @staticmethod
+    def _convert_blob_to_mp4(bucket: storage.Bucket, blob: storage.Blob, max_height: int = None):
+        """
+        Convert one video blob to MP4 and replace the original blob with it.
+
+        Args:
+            bucket: Bucket containing the video
+            blob: Video blob to convert
+            max_height: Downscale the converted video to at most this many pixels high (default: keep resolution)
+        """
+        print(f"Converting: {blob.name}")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            local_original_path = os.path.join(tmpdir, os.path.basename(blob.name))
+            local_converted_path = os.path.join(tmpdir,
+                                                os.path.splitext(os.path.basename(blob.name))[0] + ".mp4")
+
+            # Download original file
+            blob.download_to_filename(local_original_path, timeout=GCS_REQUEST_TIMEOUT)
+
+            # Convert to MP4 using ffmpeg
+            subprocess.run(build_ffmpeg_convert_command(local_original_path, local_converted_path, max_height),
+                           check=True)
 
-                    # Upload converted file
-                    new_blob_name = os.path.splitext(blob.name)[0] + ".mp4"
-                    new_blob = bucket.blob(new_blob_name)
-                    new_blob.upload_from_filename(local_converted_path)
+            # Upload converted file
+            new_blob_name = os.path.splitext(blob.name)[0] + ".mp4"
+            new_blob = bucket.blob(new_blob_name)
+            new_blob.upload_from_filename(local_converted_path, timeout=GCS_REQUEST_TIMEOUT,
+                                          retry=GCS_UPLOAD_RETRY)
 
-                    # Delete original file
-                    blob.delete()
+            # Delete original file
+            blob.delete(timeout=GCS_REQUEST_TIMEOUT)
 
-                    print(f"Converted and replaced: {blob.name} with {new_blob_name}")
+            print(f"Converted and replaced: {blob.name} with {new_blob_name}")
 
     def generate_signed_url(self, bucket_name: str, blob_name: str, expiration_hours: int = 1) -> str:
         """
@@ -319,8 +415,11 @@ class GoogleClient:
             int: Number of files in the specified path or the whole bucket.
         """
         bucket = self.storage_client.bucket(bucket_name)
+        # Only the names are requested, since the files are just counted
+        fields = "items(name),nextPageToken"
         if path:
-            blobs = list(bucket.list_blobs(prefix=path))
+            blobs = bucket.list_blobs(prefix=path, fields=fields, timeout=GCS_REQUEST_TIMEOUT)
         else:
-            blobs = list(bucket.list_blobs())
-        return len(blobs)
\ No newline at end of file
+            blobs = bucket.list_blobs(fields=fields, timeout=GCS_REQUEST_TIMEOUT)
+        # Count while paging through the listing, so the blobs of large frame folders are never all held in memory
+        return sum(1 for _ in blobs)
\ No newline at end of file
@@ -7,8 +7,21 @@ and other utilities used by both backend and data science components.
 
 from .logger_utils import create_logger
 from .env_utils import load_env_variables
+from .file_utils import write_bytes_atomic
+from .json_utils import loads_json, dumps_json_bytes, write_json_atomic
+from .retry_utils import call_with_retry
+from .rate_limit_utils import RateLimiter, model_request_limiter
+from .keyword_utils import KeywordMatcher
 
 __all__ = [
     'create_logger',
-    'load_env_variables'
+    'load_env_variables',
+    'write_bytes_atomic',
+    'loads_json',
+    'dumps_json_bytes',
+    'write_json_atomic',
+    'call_with_retry',
+    'RateLimiter',
+    'model_request_limiter',
+    'KeywordMatcher'
 ]
@@ -0,0 +1,36 @@
+"""
+File utilities for the Guardify-AI project.
+
+This module provides crash-safe file writing that can be used across all
+components of the project (backend, data science, etc.).
+"""
+
+import os
+import tempfile
+
+
+def write_bytes_atomic(path: str, data: bytes) -> None:
+    """
+    Write bytes to a file atomically.
+
+    The data is written to a temporary file in the same directory and then moved over the
+    target path with os.replace, so readers (and re-runs after a crash) only ever see either
+    the previous file or the complete new one - never a partially written file.
+
+    Args:
+        path (str): Path of the file to write
+        data (bytes): Content to write
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Don't leave partial temporary files behind
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,70 @@
+"""
+JSON utilities for the Guardify-AI project.
+
+This module provides fast JSON serialization shared across all components of the
+project. orjson is used when it is installed and the standard library json module
+is used otherwise.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+from .file_utils import write_bytes_atomic
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to the standard library json module
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Deserialize a JSON document.
+
+    Args:
+        data (Union[str, bytes]): JSON document
+
+    Returns:
+        Any: The deserialized object
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON (orjson's decode error is a subclass of it)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json_bytes(obj: Any, default: Optional[Callable[[Any], Any]] = None, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj (Any): Object to serialize
+        default (Callable, optional): Called for objects that can't otherwise be serialized
+        indent (bool, optional): Pretty-print with an indentation of 2 spaces. Defaults to False.
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+    return json.dumps(obj, default=default, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def write_json_atomic(path: str, obj: Any, default: Optional[Callable[[Any], Any]] = None,
+                      indent: bool = False) -> None:
+    """
+    Serialize an object to JSON and write it to a file atomically.
+
+    Args:
+        path (str): Path of the JSON file to write
+        obj (Any): Object to serialize
+        default (Callable, optional): Called for objects that can't otherwise be serialized
+        indent (bool, optional): Pretty-print with an indentation of 2 spaces. Defaults to False.
+    """
+    write_bytes_atomic(path, dumps_json_bytes(obj, default=default, indent=indent))
@@ -0,0 +1,76 @@
+"""
+Keyword matching utilities for the Guardify-AI project.
+
+This module provides a precompiled matcher finding which of a fixed set of keywords
+occur in a text with a single regex scan, instead of one substring scan per keyword.
+"""
+
+import re
+from typing import Iterable, List
+
+
+class KeywordMatcher:
+    """
+    Find which keywords occur (as substrings) in a text.
+
+    Results are the same as checking ``keyword in text`` for every keyword, but the text is scanned
+    once by a precompiled alternation of all keywords. Matching is case-sensitive, like ``in``.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Initialize the matcher.
+
+        Args:
+            keywords (Iterable[str]): Keywords to look for. Results keep this order.
+        """
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+
+        # Longest keywords first, so a match at each position is the longest keyword starting there.
+        # The lookahead makes matches zero-width, so overlapping keywords are all visited.
+        alternation = "|".join(map(re.escape, sorted(self.keywords, key=len, reverse=True)))
+        self._pattern = re.compile(f"(?=({alternation}))") if self.keywords else None
+
+        # A matched keyword implies every (shorter) keyword contained in it, e.g. "concealment"
+        # implies "conceal", which the longest-first match at the same position would hide
+        self._implied = {
+            keyword: frozenset(other for other in self.keywords if other in keyword)
+            for keyword in self.keywords
+        }
+
+    def _find_set(self, text: str) -> set:
+        """Get the set of keywords occurring in the text."""
+        found = set()
+        if self._pattern is None:
+            return found
+
+        for match in self._pattern.finditer(text):
+            found |= self._implied[match.group(1)]
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+    def find_all(self, text: str) -> List[str]:
+        """
+        Get the keywords occurring in a text.
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            List[str]: Keywords found in the text, in the order the matcher was created with
+        """
+        found = self._find_set(text)
+        return [keyword for keyword in self.keywords if keyword in found]
+
+    def count(self, text: str) -> int:
+        """
+        Count the distinct keywords occurring in a text.
+
+        Args:
+            text (str): Text to search
+
+        Returns:
+            int: Number of keywords found in the text
+        """
+        return len(self._find_set(text))
@@ -6,8 +6,12 @@ across all components of the project (backend, data science, etc.).
 """
 
 import logging
+import threading
 from pathlib import Path
 
+# Serializes handler setup, so loggers created concurrently (e.g. from worker threads) get one set of handlers
+_logger_setup_lock = threading.Lock()
+
 
 def create_logger(name: str, log_file: str, logs_dir: str = None) -> logging.Logger:
     """
@@ -22,6 +26,29 @@ def create_logger(name: str, log_file: str, logs_dir: str = None) -> logging.Log
     Returns:
         logging.Logger: Configured logger instance
     """
+    # Create logger
+    logger = logging.getLogger(name)
+
+    # Avoid adding handlers multiple times (and opening another file handle) if logger already exists
+    if logger.handlers:
+        return logger
+
+    with _logger_setup_lock:
+        if not logger.handlers:
+            _add_handlers(logger, log_file, logs_dir)
+
+    return logger
+
+
+def _add_handlers(logger: logging.Logger, log_file: str, logs_dir: str = None) -> None:
+    """
+    Configure a new logger with a file handler and a console handler.
+
+    Args:
+        logger (logging.Logger): Logger to configure
+        log_file (str): Name of the log file
+        logs_dir (str, optional): Directory to store logs. If None, uses the 'logs' directory in the project root.
+    """
     # Determine logs directory
     if logs_dir is None:
         # Use project root/logs as default
@@ -29,19 +56,12 @@ def create_logger(name: str, log_file: str, logs_dir: str = None) -> logging.Log
         logs_dir = project_root / 'logs'
     else:
         logs_dir = Path(logs_dir)
-    
+
     # Create logs directory if it doesn't exist
     logs_dir.mkdir(exist_ok=True)
-    
+
     log_path = logs_dir / log_file
-    
-    # Create logger
-    logger = logging.getLogger(name)
-    
-    # Avoid adding handlers multiple times if logger already exists
-    if logger.handlers:
-        return logger
-        
+
     logger.setLevel(logging.INFO)
 
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -55,5 +75,3 @@ def create_logger(name: str, log_file: str, logs_dir: str = None) -> logging.Log
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
-
-    return logger
@@ -0,0 +1,61 @@
+"""
+Rate limiting utilities for the Guardify-AI project.
+
+This module provides a thread-safe request rate limiter, so concurrent calls to
+remote services (e.g. Vertex AI models) stay within a requests-per-minute quota
+instead of bursting into rate limit errors.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls evenly to at most a number of calls per minute.
+
+    Every call reserves the next free time slot and waits for it outside the lock, so concurrent
+    callers are released one interval apart instead of all at once.
+    """
+
+    def __init__(self, max_calls_per_minute: Optional[float] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_calls_per_minute (float, optional): Maximum number of calls per minute.
+                None or 0 disables limiting.
+        """
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._interval = 0.0
+        self.set_rate(max_calls_per_minute)
+
+    def set_rate(self, max_calls_per_minute: Optional[float]) -> None:
+        """
+        Change the maximum call rate.
+
+        Args:
+            max_calls_per_minute (float, optional): Maximum number of calls per minute.
+                None or 0 disables limiting.
+        """
+        with self._lock:
+            self._interval = 60.0 / max_calls_per_minute if max_calls_per_minute else 0.0
+
+    def acquire(self) -> None:
+        """Wait until the next call is allowed."""
+        if not self._interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Process-wide limiter for model requests. Unlimited until a rate is configured with set_rate.
+model_request_limiter = RateLimiter()
@@ -0,0 +1,76 @@
+"""
+Retry utilities for the Guardify-AI project.
+
+This module provides retrying with exponential backoff and jitter for calls to
+remote services (e.g. Vertex AI models) that can fail transiently.
+"""
+
+import logging
+import random
+import time
+from typing import Callable, Optional, Tuple, Type, TypeVar
+
+from .rate_limit_utils import RateLimiter, model_request_limiter
+
+try:
+    from google.api_core import exceptions as google_exceptions
+
+    # Errors returned by Google APIs for rate limiting and temporary server-side failures
+    TRANSIENT_GOOGLE_API_ERRORS: Tuple[Type[BaseException], ...] = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.InternalServerError,
+        google_exceptions.BadGateway,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+    )
+except ImportError:
+    TRANSIENT_GOOGLE_API_ERRORS = ()  # google-api-core not installed, nothing to retry on
+
+T = TypeVar("T")
+
+
+def call_with_retry(func: Callable[[], T],
+                    retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_GOOGLE_API_ERRORS,
+                    max_attempts: int = 4,
+                    base_delay: float = 1.0,
+                    max_delay: float = 30.0,
+                    logger: Optional[logging.Logger] = None,
+                    rate_limiter: Optional[RateLimiter] = model_request_limiter) -> T:
+    """
+    Call a function, retrying transient failures with exponential backoff and full jitter.
+
+    The delay before retry n is drawn uniformly from [0, min(max_delay, base_delay * 2 ** n)], so
+    concurrent callers that failed together don't retry in lockstep.
+
+    Args:
+        func (Callable[[], T]): Function to call (wrap arguments with a lambda or functools.partial)
+        retry_on (Tuple[Type[BaseException], ...]): Exception types considered transient.
+            Defaults to the transient Google API errors.
+        max_attempts (int): Maximum number of attempts, including the first one. Defaults to 4.
+        base_delay (float): Backoff base in seconds. Defaults to 1.0.
+        max_delay (float): Maximum backoff in seconds. Defaults to 30.0.
+        logger (logging.Logger, optional): Logger for retry warnings
+        rate_limiter (RateLimiter, optional): Limiter acquired before every attempt. Defaults to the
+            process-wide model request limiter; None disables limiting.
+
+    Returns:
+        T: The function's return value
+
+    Raises:
+        Exception: The last error if all attempts failed, or any non-transient error immediately
+    """
+    logger = logger or logging.getLogger(__name__)
+
+    for attempt in range(max_attempts):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            return func()
+        except retry_on as e:
+            if attempt == max_attempts - 1:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            logger.warning(f"Transient error (attempt {attempt + 1}/{max_attempts}): {e}. "
+                           f"Retrying in {delay:.1f} seconds...")
+            time.sleep(delay)